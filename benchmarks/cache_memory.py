@@ -0,0 +1,255 @@
+"""
+Gateway cache memory benchmark.
+
+Builds discord.py's connection state with each CACHE_PROFILE (see
+utils.cache_profile), feeds it synthetic GUILD_CREATE payloads for N
+guilds plus some message traffic, and reports how much memory the client
+cache holds afterwards. Each (profile, guild count) runs in a fresh
+interpreter; no gateway or REST traffic is involved.
+
+    python benchmarks/cache_memory.py
+    python benchmarks/cache_memory.py --guilds 1000 10000 --members 50
+    python benchmarks/cache_memory.py --profiles ticket full --json report.json
+
+"full" guilds carry their whole member list, as they would after
+chunking; the other profiles only get the bot's own member, which is what
+Discord sends without the members intent.
+
+The caches are read back through the public Client API, but there is no
+public way to feed gateway payloads into a client that isn't connected:
+they go through ConnectionState internals (_add_guild_from_data,
+parse_message_create), written against discord.py 2.7.1. The report
+warns when another version is installed.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISCORD_PY_VERSION = "2.7.1"  # Version the ConnectionState internals below were checked against
+BOT_USER_ID = 1 << 60
+
+
+# ===============================
+# SYNTHETIC PAYLOADS
+# ===============================
+def _user(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id % 100000}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None
+    }
+
+
+def _member(user_id: int, role_ids: list) -> dict:
+    return {
+        "user": _user(user_id),
+        "roles": role_ids,
+        "joined_at": "2024-01-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "flags": 0
+    }
+
+
+def guild_payload(rng: random.Random, index: int, members: int, channels: int, with_members: bool) -> dict:
+    guild_id = (index + 1) << 22
+    role_ids = [str(guild_id + 1 + r) for r in range(10)]
+    category_ids = [guild_id + 100 + c for c in range(max(1, channels // 10))]
+
+    member_count = int(rng.expovariate(1 / members)) + 1
+    payload = {
+        "id": str(guild_id),
+        "name": f"Guild {index}",
+        "icon": None,
+        "owner_id": str(guild_id + 999),
+        "features": [],
+        "large": member_count > 250,
+        "member_count": member_count,
+        "roles": [
+            {
+                "id": str(guild_id),  # @everyone
+                "name": "@everyone", "color": 0, "hoist": False, "position": 0,
+                "permissions": "1024", "managed": False, "mentionable": False, "flags": 0
+            }
+        ] + [
+            {
+                "id": role_id,
+                "name": f"Role {r}", "color": 0, "hoist": False, "position": r + 1,
+                "permissions": "0", "managed": False, "mentionable": False, "flags": 0
+            }
+            for r, role_id in enumerate(role_ids)
+        ],
+        "channels": [
+            {"id": str(category_id), "type": 4, "name": f"category-{c}", "position": c,
+             "permission_overwrites": []}
+            for c, category_id in enumerate(category_ids)
+        ] + [
+            {"id": str(guild_id + 1000 + c), "type": 0, "name": f"ticket-{c}", "position": c,
+             "parent_id": str(category_ids[c % len(category_ids)]),
+             "topic": f"panel:support;owner:{guild_id + 5000 + c}",
+             "permission_overwrites": [
+                 {"id": str(guild_id), "type": 0, "allow": "0", "deny": "1024"},
+                 {"id": str(guild_id + 5000 + c), "type": 1, "allow": "68608", "deny": "0"}
+             ]}
+            for c in range(channels)
+        ],
+        "emojis": [
+            {"id": str(guild_id + 2000 + e), "name": f"emoji{e}", "animated": False,
+             "available": True, "require_colons": True, "managed": False, "roles": []}
+            for e in range(20)
+        ],
+        "stickers": [],
+        "members": [_member(BOT_USER_ID, [])],
+        "presences": [],
+        "voice_states": [],
+        "threads": []
+    }
+    if with_members:
+        payload["members"] += [
+            _member(guild_id + 5000 + m, rng.sample(role_ids, 2)) for m in range(member_count)
+        ]
+    return payload
+
+
+def message_payload(guild: dict, rng: random.Random, message_id: int) -> dict:
+    channel = rng.choice([c for c in guild["channels"] if c["type"] == 0])
+    author_id = int(guild["id"]) + 5000 + rng.randrange(50)
+    return {
+        "id": str(message_id),
+        "channel_id": channel["id"],
+        "guild_id": guild["id"],
+        "author": _user(author_id),
+        "member": {k: v for k, v in _member(author_id, []).items() if k != "user"},
+        "content": "Hello, I need help with my order " * 3,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0
+    }
+
+
+# ===============================
+# MEASURED RUN (child interpreter)
+# ===============================
+def run_in_process(profile: str, guilds: int, members: int, channels: int, messages: int, seed: int) -> dict:
+    sys.path.insert(0, REPO_ROOT)
+    import discord
+    from utils.cache_profile import client_options
+
+    options = client_options(profile)
+    intents = options["intents"]
+
+    tracemalloc.start()
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+
+    client = discord.Client(**options)
+    state = client._connection  # Internal: see the module docstring
+    state.user = discord.ClientUser(state=state, data={**_user(BOT_USER_ID), "bot": True})
+
+    # Discord only sends member lists (chunks) with the members intent
+    rng = random.Random(seed)
+    payloads = []
+    for index in range(guilds):
+        payload = guild_payload(rng, index, members, channels, with_members=intents.members)
+        state._add_guild_from_data(payload)
+        # Keep the ids needed for message traffic, not the payload itself
+        payloads.append({"id": payload["id"], "channels": payload["channels"][-channels:]})
+
+    # MESSAGE_CREATE only arrives with the guild_messages intent
+    if intents.guild_messages:
+        message_id = 1 << 40
+        for _ in range(messages):
+            message_id += 1
+            state.parse_message_create(message_payload(rng.choice(payloads), rng, message_id))
+
+    del payloads
+    gc.collect()
+    cached = tracemalloc.get_traced_memory()[0] - before
+    elapsed = time.perf_counter() - started
+
+    return {
+        "profile": profile,
+        "guilds": guilds,
+        "cache_mb": round(cached / (1024 * 1024), 2),
+        "per_guild_kb": round(cached / 1024 / max(guilds, 1), 2),
+        "cached_members": sum(len(guild.members) for guild in client.guilds),
+        "cached_users": len(client.users),
+        "cached_messages": len(client.cached_messages),
+        "build_seconds": round(elapsed, 3),
+        "discord_py": discord.__version__
+    }
+
+
+def _spawn(args, profile: str, guilds: int) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable, os.path.abspath(__file__), "--run",
+            "--profiles", profile, "--guilds", str(guilds),
+            "--members", str(args.members), "--channels", str(args.channels),
+            "--messages", str(args.messages), "--seed", str(args.seed)
+        ],
+        check=True, capture_output=True, text=True, encoding="utf-8"
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=["default", "ticket", "full"])
+    parser.add_argument("--guilds", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--members", type=int, default=50, help="average members per guild")
+    parser.add_argument("--channels", type=int, default=30, help="text channels per guild")
+    parser.add_argument("--messages", type=int, default=20000, help="MESSAGE_CREATE events to replay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = run_in_process(
+            args.profiles[0], args.guilds[0], args.members, args.channels, args.messages, args.seed
+        )
+        print(json.dumps(result))
+        return
+
+    results = []
+    print(f"📦 {args.members} member(s) per guild on average, {args.channels} channel(s), "
+          f"{args.messages} message(s)")
+    print(f"   {'profile':<8} {'guilds':>7} {'cache MiB':>10} {'KiB/guild':>10} "
+          f"{'members':>9} {'messages':>9}")
+    for guilds in args.guilds:
+        for profile in args.profiles:
+            result = _spawn(args, profile, guilds)
+            results.append(result)
+            print(f"   {profile:<8} {guilds:>7} {result['cache_mb']:>10.1f} {result['per_guild_kb']:>10.1f} "
+                  f"{result['cached_members']:>9} {result['cached_messages']:>9}")
+
+    if results and results[0]["discord_py"] != DISCORD_PY_VERSION:
+        print(f"⚠️ Measured with discord.py {results[0]['discord_py']}; this benchmark was written "
+              f"against {DISCORD_PY_VERSION} and feeds payloads through its internals")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=4)
+        print(f"✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
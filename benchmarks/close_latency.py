@@ -0,0 +1,262 @@
+"""
+Ticket close latency benchmark.
+
+Runs TicketCloseView.close_ticket end to end on real discord.py objects
+(guild, channels, members, messages) whose HTTP client is replaced by a
+stub that answers every REST call after a simulated round trip. The
+transcript is rendered for real. Reports p50/p95 close latency and the
+REST calls each close makes.
+
+    python benchmarks/close_latency.py
+    python benchmarks/close_latency.py --closes 200 --latency-ms 120 --messages 300
+    python benchmarks/close_latency.py --closer staff --json report.json
+
+--closer owner has the ticket owner close their ticket (owner taken from
+the interaction); --closer staff has an admin close it (owner resolved
+through one REST call).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUILD_ID = 1 << 50
+BOT_ID = GUILD_ID + 1
+OWNER_ID = GUILD_ID + 2
+STAFF_ID = GUILD_ID + 3
+TRANSCRIPT_CHANNEL_ID = GUILD_ID + 10
+TICKET_CHANNEL_BASE = GUILD_ID + 1000
+
+
+# ===============================
+# PAYLOADS
+# ===============================
+def _user(user_id: int) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id % 1000}", "discriminator": "0",
+            "global_name": None, "avatar": None}
+
+
+def _member(user_id: int) -> dict:
+    return {"user": _user(user_id), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def _channel(channel_id: int, name: str, topic: str | None = None,
+             parent_id: int | None = None, channel_type: int = 0) -> dict:
+    return {"id": str(channel_id), "guild_id": str(GUILD_ID), "type": channel_type, "name": name,
+            "position": 0, "topic": topic, "parent_id": str(parent_id) if parent_id else None,
+            "permission_overwrites": []}
+
+
+def _message(message_id: int, channel_id: int, author_id: int, content: str) -> dict:
+    return {
+        "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(GUILD_ID),
+        "author": _user(author_id), "content": content,
+        "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+        "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "embeds": [], "components": [], "pinned": False, "type": 0
+    }
+
+
+# ===============================
+# STUB HTTP LAYER
+# ===============================
+def make_http(discord, latency_ms: float, jitter: float, messages: dict, rng: random.Random):
+    class StubHTTP(discord.http.HTTPClient):
+        """HTTPClient whose request() answers locally after a simulated round trip."""
+
+        async def request(self, route, *, files=None, form=None, **kwargs):
+            delay = max(0.0, rng.gauss(latency_ms, latency_ms * jitter)) / 1000
+            await asyncio.sleep(delay)
+
+            key = (route.method, route.path)
+            if key == ("GET", "/channels/{channel_id}/messages"):
+                after = int(kwargs["params"].get("after") or 0)
+                page = [m for m in messages.get(route.channel_id, ()) if int(m["id"]) > after]
+                page = page[:kwargs["params"]["limit"]]
+                return list(reversed(page))  # Discord returns newest first
+            if key == ("PATCH", "/channels/{channel_id}"):
+                payload = kwargs.get("json") or {}
+                return {**_channel(route.channel_id, payload.get("name", "ticket")), **payload}
+            if key == ("POST", "/guilds/{guild_id}/channels"):
+                payload = kwargs.get("json") or {}
+                return {**_channel(rng.getrandbits(60), payload["name"]), **payload}
+            if key == ("POST", "/channels/{channel_id}/messages"):
+                return _message(rng.getrandbits(60), route.channel_id, BOT_ID, "")
+            if key == ("GET", "/guilds/{guild_id}/members/{member_id}"):
+                return _member(int(re.search(r"/members/(\d+)", route.url).group(1)))
+            if key == ("GET", "/users/{user_id}"):
+                return _user(int(re.search(r"/users/(\d+)", route.url).group(1)))
+            raise RuntimeError(f"unstubbed REST call {route.method} {route.path}")
+
+    return StubHTTP(asyncio.get_running_loop())
+
+
+def make_guild(discord, http, channels: list):
+    """ConnectionState and a cached guild (bot member, @everyone, ``channels``) on ``http``."""
+    from discord.state import ConnectionState
+
+    state = ConnectionState(
+        dispatch=lambda *a, **k: None, handlers={}, hooks={}, http=http,
+        intents=discord.Intents.none(), member_cache_flags=discord.MemberCacheFlags.none(),
+        max_messages=None, chunk_guilds_at_startup=False
+    )
+    state.loop = asyncio.get_running_loop()
+    state.user = discord.ClientUser(state=state, data={**_user(BOT_ID), "bot": True})
+
+    guild = state._add_guild_from_data({
+        "id": str(GUILD_ID), "name": "Bench", "icon": None, "owner_id": str(STAFF_ID),
+        "features": [], "large": False, "member_count": 3,
+        "roles": [{"id": str(GUILD_ID), "name": "@everyone", "color": 0, "hoist": False, "position": 0,
+                   "permissions": "1024", "managed": False, "mentionable": False, "flags": 0}],
+        "channels": channels,
+        "members": [_member(BOT_ID)], "emojis": [], "stickers": [],
+        "presences": [], "voice_states": [], "threads": []
+    })
+    return state, guild
+
+
+class _Response:
+    def __init__(self, sleep):
+        self._sleep = sleep
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        await self._sleep()
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        await self._sleep()
+        self._done = True
+
+
+class _Followup:
+    def __init__(self, sleep):
+        self._sleep = sleep
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        await self._sleep()
+        self.sent.append(content)
+
+
+# ===============================
+# RUN
+# ===============================
+async def run(args) -> dict:
+    sys.path.insert(0, REPO_ROOT)
+    import discord
+    from tickets.panels.panel_storage import PanelStorage
+    from tickets.ticket_index import ticket_topic
+    from tickets.ticket_manager import TicketCloseView
+    from utils.api_calls import count_api_calls, install
+
+    rng = random.Random(args.seed)
+    messages = {}
+    http = make_http(discord, args.latency_ms, args.jitter, messages, rng)
+    install(http)
+
+    async def interaction_round_trip():
+        await asyncio.sleep(max(0.0, rng.gauss(args.latency_ms, args.latency_ms * args.jitter)) / 1000)
+
+    state, guild = make_guild(discord, http, [_channel(TRANSCRIPT_CHANNEL_ID, "transcripts")])
+    owner = discord.Member(data=_member(OWNER_ID), guild=guild, state=state)
+    staff = discord.Member(data=_member(STAFF_ID), guild=guild, state=state)
+    closer = owner if args.closer == "owner" else staff
+
+    async def fetch_user(user_id: int):
+        return discord.User(state=state, data=await http.get_user(user_id))
+
+    PanelStorage().save_panel(GUILD_ID, "support", {
+        "title": "Support", "options": [], "transcript_channel_id": TRANSCRIPT_CHANNEL_ID
+    })
+
+    view = TicketCloseView(ticket_owner_id=0, panel_name="dummy", guild_id=0)
+    latencies, call_counts, reports = [], [], []
+    for index in range(args.closes):
+        channel_id = TICKET_CHANNEL_BASE + index
+        topic = ticket_topic("support", OWNER_ID, "bench")
+        guild._add_channel(discord.TextChannel(
+            state=state, guild=guild, data=_channel(channel_id, f"support-user{index}", topic)
+        ))
+        messages[channel_id] = [
+            _message(channel_id * 1000 + m, channel_id, OWNER_ID if m % 2 else STAFF_ID,
+                     f"Message {m}: **hello** `code` <@{OWNER_ID}>")
+            for m in range(args.messages)
+        ]
+
+        interaction = SimpleNamespace(
+            guild=guild,
+            guild_id=GUILD_ID,
+            channel=guild.get_channel(channel_id),
+            user=closer,
+            client=SimpleNamespace(fetch_user=fetch_user),
+            response=_Response(interaction_round_trip),
+            followup=_Followup(interaction_round_trip)
+        )
+
+        started = time.perf_counter()
+        with count_api_calls("ticket_close") as calls:
+            await TicketCloseView.close_ticket(view, interaction, None)
+        latencies.append((time.perf_counter() - started) * 1000)
+        call_counts.append(calls.count)
+        reports.append(interaction.followup.sent[-1])
+        messages.pop(channel_id)
+
+    failures = [report for report in reports if not report.startswith("Ticket closed successfully")]
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "closes": args.closes,
+        "closer": args.closer,
+        "latency_ms": args.latency_ms,
+        "messages": args.messages,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(quantiles[94], 1),
+        "max_ms": round(max(latencies), 1),
+        "rest_calls_per_close": statistics.median(call_counts),
+        "failures": len(failures),
+        "first_failure": failures[0] if failures else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--closes", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=150, help="messages per ticket")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="mean simulated REST round trip")
+    parser.add_argument("--jitter", type=float, default=0.25, help="round trip std-dev, as a fraction of the mean")
+    parser.add_argument("--closer", choices=("owner", "staff"), default="owner")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write the result to this file")
+    args = parser.parse_args()
+
+    # Panel/settings storage works relative to the current directory
+    os.chdir(tempfile.mkdtemp(prefix="guibot-close-"))
+    result = asyncio.run(run(args))
+
+    print(f"🔒 {result['closes']} close(s) by the {result['closer']}, "
+          f"{result['messages']} message(s) each, ~{result['latency_ms']:.0f} ms per REST call")
+    print(f"   p50 {result['p50_ms']:.1f} ms   p95 {result['p95_ms']:.1f} ms   max {result['max_ms']:.1f} ms")
+    print(f"   REST calls per close: {result['rest_calls_per_close']}")
+    if result["failures"]:
+        print(f"⚠️ {result['failures']} close(s) failed: {result['first_failure']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "result": result}, f, indent=4)
+        print(f"✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Cold-start benchmark.
+
+Generates a synthetic config tree (legacy flat layout, as older bots
+have on disk) for N guilds x M panels x K options, then starts the bot's
+startup path in a fresh interpreter against a stub client and reports
+wall time, peak RSS and a per-phase breakdown.
+
+    python benchmarks/cold_start.py --guilds 5000 --panels 3 --options 5
+    python benchmarks/cold_start.py --compare
+    python benchmarks/cold_start.py --save-baseline
+
+--compare reports the change against benchmarks/baselines/cold_start.json,
+a committed run with the default parameters (re-record it with
+--save-baseline when the startup path changes on purpose). Timings
+depend on the machine: compare runs on the same one.
+
+--restart measures a second start over the same tree (migrations and the
+config snapshot already done), i.e. an ordinary restart, and exits with
+status 1 if that start parsed any guild config file in full (it all has
+to come from the snapshot).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Committed reference run (default parameters); --save-baseline replaces it
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baselines", "cold_start.json")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ===============================
+# MEASUREMENT HELPERS
+# ===============================
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None if unavailable)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def _parses() -> int:
+    """Full-file JSON parses so far (0 until utils.json_cache is imported)."""
+    json_cache = sys.modules.get("utils.json_cache")
+    return json_cache.read_json_count() if json_cache else 0
+
+
+class Phases:
+    def __init__(self):
+        self.results = {}
+        self._started = time.perf_counter()
+
+    def measure(self, name):
+        phases = self
+
+        class _Phase:
+            def __enter__(self):
+                self.parses = _parses()
+                self.start = time.perf_counter()
+
+            def __exit__(self, *exc):
+                phases.results[name] = {
+                    "seconds": round(time.perf_counter() - self.start, 4),
+                    "peak_rss_mb": peak_rss_mb(),
+                    "file_parses": _parses() - self.parses
+                }
+
+        return _Phase()
+
+    def total(self) -> float:
+        return round(time.perf_counter() - self._started, 4)
+
+
+# ===============================
+# SYNTHETIC DATA
+# ===============================
+def generate(data_root: str, guilds: int, panels: int, options: int, embeds: int, seed: int = 1):
+    """Legacy flat tree: data/ticket_panels/{gid}.json + data/embeds_{gid}.json."""
+    rng = random.Random(seed)
+    panel_dir = os.path.join(data_root, "data", "ticket_panels")
+    os.makedirs(panel_dir, exist_ok=True)
+
+    for _ in range(guilds):
+        guild_id = rng.getrandbits(62) | (1 << 56)
+
+        guild_panels = {}
+        for p in range(panels):
+            embed_options = min(1, embeds)
+            guild_panels[f"panel-{p}"] = {
+                "title": f"Support panel {p}",
+                "description": "Select an option below " * 4,
+                "color": "#5865F2",
+                "footer_text": "Support team",
+                "style": "dropdown" if p % 2 else "buttons",
+                "fields": [],
+                "options": [
+                    {
+                        "type": "embed" if o < embed_options else "ticket",
+                        "label": f"Option {o}",
+                        "emoji": "🎫",
+                        "description": "Open a ticket for this topic",
+                        "category_id": str(rng.getrandbits(62)),
+                        "embed_name": "embed-0" if o < embed_options else None,
+                        "ticket_message": "Thanks for reaching out! " * 3
+                    }
+                    for o in range(options)
+                ]
+            }
+        with open(os.path.join(panel_dir, f"{guild_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(guild_panels, f, indent=4)
+
+        guild_embeds = {
+            f"embed-{e}": {
+                "title": f"Embed {e}",
+                "description": "Lorem ipsum dolor sit amet " * 10,
+                "color": "#2B2D31",
+                "fields": [{"name": "Field", "value": "Value", "inline": True}] * 3
+            }
+            for e in range(embeds)
+        }
+        with open(os.path.join(data_root, "data", f"embeds_{guild_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(guild_embeds, f, indent=2)
+
+
+# ===============================
+# STUB CLIENT
+# ===============================
+class _StubTree:
+    def get_commands(self):
+        return []
+
+    async def sync(self):
+        return []
+
+
+class _StubHTTP:
+    async def request(self, route, **kwargs):
+        raise RuntimeError(f"unexpected REST call during startup: {route.method} {route.path}")
+
+
+class StubClient:
+    """Just enough of commands.Bot for the startup path (no gateway, no REST)."""
+
+    application_id = 0
+
+    def __init__(self):
+        self.http = _StubHTTP()
+        self.tree = _StubTree()
+        self.views = []
+        self.dynamic_items = []
+
+    def add_view(self, view, message_id=None):
+        self.views.append(view)
+
+    def add_dynamic_items(self, *items):
+        self.dynamic_items.extend(items)
+
+
+async def _startup(phases: Phases) -> dict:
+    with phases.measure("import"):
+        sys.path.insert(0, REPO_ROOT)
+        import bot as bot_module
+        from tickets.panels.panel_schema import legacy_option_id
+        from tickets.panels.panel_storage import PanelStorage
+        from utils.data_layout import iter_guild_files
+        from utils.guild_hydration import hydrator
+
+    with phases.measure("prepare_storage"):
+        bot_module.prepare_storage()
+
+    # setup_hook / on_ready only reference the module-level `bot`
+    client = StubClient()
+    bot_module.bot = client
+    with phases.measure("setup_hook"):
+        await bot_module.setup_hook()
+
+    guild_ids = [guild_id for guild_id, _ in iter_guild_files("panels")]
+    with phases.measure("guild_available"):
+        for guild_id in guild_ids:
+            await bot_module.on_guild_available(SimpleNamespace(id=guild_id))
+        await hydrator._queue.join()
+
+    storage = PanelStorage()
+    sample = random.Random(2).sample(guild_ids, min(1000, len(guild_ids)))
+    # Generated options had no ids; the migration derives them
+    option_id = legacy_option_id("panel-0", 0)
+    with phases.measure("first_click"):
+        for guild_id in sample:
+            await storage.aresolve_option(guild_id, option_id)
+
+    with phases.measure("shutdown"):
+        hydrator.stop()
+        bot_module.close_storage()
+
+    return {"registered_views": len(client.views), "dynamic_items": len(client.dynamic_items)}
+
+
+def run_in_process(data_root: str) -> dict:
+    """Measured start (runs in the child interpreter, cwd = data_root)."""
+    os.chdir(data_root)
+    phases = Phases()
+    extra = asyncio.run(_startup(phases))
+    return {
+        "wall_seconds": phases.total(),
+        "peak_rss_mb": peak_rss_mb(),
+        "phases": phases.results,
+        **extra
+    }
+
+
+def _spawn(data_root: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", data_root],
+        check=True, capture_output=True, text=True, encoding="utf-8"
+    ).stdout
+    # The bot prints progress; the result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# ===============================
+# REPORT / BASELINE
+# ===============================
+def report(result: dict, baseline: dict | None = None):
+    def delta(now, before):
+        if not before:
+            return ""
+        return f" ({(now - before) / before * 100:+.1f}%)"
+
+    base_phases = (baseline or {}).get("phases", {})
+    print(f"⏱  wall time  {result['wall_seconds']:.3f}s"
+          f"{delta(result['wall_seconds'], (baseline or {}).get('wall_seconds'))}")
+    if result["peak_rss_mb"] is not None:
+        print(f"💾 peak RSS   {result['peak_rss_mb']:.1f} MiB"
+              f"{delta(result['peak_rss_mb'], (baseline or {}).get('peak_rss_mb'))}")
+    for name, phase in result["phases"].items():
+        before = base_phases.get(name, {}).get("seconds")
+        print(f"   {name:<16} {phase['seconds']:.3f}s{delta(phase['seconds'], before)}"
+              f"  {phase.get('file_parses', 0)} file(s) parsed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--panels", type=int, default=3)
+    parser.add_argument("--options", type=int, default=5)
+    parser.add_argument("--embeds", type=int, default=2)
+    parser.add_argument("--restart", action="store_true", help="measure a restart over an already migrated tree")
+    parser.add_argument("--keep", action="store_true", help="keep the generated data directory")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="compare against the stored baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_in_process(args.run)))
+        return
+
+    params = {
+        "guilds": args.guilds,
+        "panels": args.panels,
+        "options": args.options,
+        "embeds": args.embeds,
+        "restart": args.restart
+    }
+    data_root = tempfile.mkdtemp(prefix="guibot-bench-")
+    try:
+        print(f"📦 Generating {args.guilds} guild(s) x {args.panels} panel(s) x {args.options} option(s) ...")
+        generate(data_root, args.guilds, args.panels, args.options, args.embeds)
+        if args.restart:
+            _spawn(data_root)
+        result = _spawn(data_root)
+    finally:
+        if args.keep:
+            print(f"📁 Data kept in {data_root}")
+        else:
+            shutil.rmtree(data_root, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("params") != params:
+                print(f"⚠️ Baseline was recorded with {stored.get('params')}")
+            baseline = stored.get("result")
+        else:
+            print(f"⚠️ No baseline at {args.baseline}; record one with --save-baseline")
+
+    report(result, baseline)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "python": sys.version.split()[0], "result": result}, f, indent=4)
+        print(f"✅ Baseline saved to {args.baseline}")
+
+    if args.restart:
+        # Guild config has to come from the snapshot; setup_hook only reads
+        # the command sync state, one file whatever the number of guilds
+        parsed = {name: phase["file_parses"] for name, phase in result["phases"].items()
+                  if name != "setup_hook" and phase["file_parses"]}
+        if parsed:
+            print(f"❌ Warm restart parsed config files instead of reading the snapshot: {parsed}")
+            sys.exit(1)
+        print("✅ Warm restart parsed no config file")
+
+
+if __name__ == "__main__":
+    main()
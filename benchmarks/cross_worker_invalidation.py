@@ -0,0 +1,151 @@
+"""
+Cross-worker cache invalidation check.
+
+Starts two worker processes the way launcher.py does - each with the
+module-level invalidation bus connected to the launcher's queues and a
+relay thread in between - against one shared data directory. Worker 1
+reads a guild's settings and panel (filling its caches), worker 0 writes
+new values, and worker 1 must see them. Reports how long each change
+took to show up (panel saves are published once the write-behind
+buffer flushed them, STORAGE_WRITE_DELAY) and exits with status 1 if
+worker 1 kept serving its cached copy.
+
+A control run with the buses left unconnected shows the caches do go
+stale without them.
+
+    python benchmarks/cross_worker_invalidation.py
+    python benchmarks/cross_worker_invalidation.py --rounds 50 --timeout 5
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUILD_ID = 1 << 50
+
+
+# ===============================
+# WORKER
+# ===============================
+def _worker(worker_id: int, connected: bool, outbox, inbox, conn):
+    """Answers ("read",) / ("write", n) requests from the parent over ``conn``."""
+    sys.path.insert(0, REPO_ROOT)
+    from utils.invalidation import bus
+
+    if connected:
+        bus.connect(worker_id, outbox, inbox)
+
+    from tickets.panels.panel_storage import PanelStorage
+    from utils.settings_storage import SettingsStorage
+
+    settings, panels = SettingsStorage(), PanelStorage()
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        if request[0] == "read":
+            panel = panels.get_panel(GUILD_ID, "support") or {}
+            conn.send((settings.support_role_id(GUILD_ID), panel.get("title")))
+        elif request[0] == "write":
+            value = request[1]
+            settings.set(GUILD_ID, "support_team_role_id", value)
+            panels.save_panel(GUILD_ID, "support", {"title": f"Support {value}", "options": []})
+            conn.send("ok")
+
+    # Write-behind panel saves, like bot.main's shutdown
+    from utils.json_writer import flush_all
+    flush_all()
+
+
+# ===============================
+# RUN
+# ===============================
+def run(rounds: int, timeout: float, connected: bool) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    sys.path.insert(0, REPO_ROOT)
+    from utils.invalidation import relay
+
+    outbox = ctx.Queue()
+    inboxes = [ctx.Queue(), ctx.Queue()]
+    stop = threading.Event()
+    relay_thread = threading.Thread(target=relay, args=(outbox, inboxes, stop), daemon=True)
+    relay_thread.start()
+
+    pipes, processes = [], []
+    for worker_id, inbox in enumerate(inboxes):
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker, args=(worker_id, connected, outbox, inbox, child_conn))
+        process.start()
+        pipes.append(parent_conn)
+        processes.append(process)
+    writer, reader = pipes
+
+    def ask(conn, *request):
+        conn.send(request)
+        return conn.recv()
+
+    delays, stale = [], 0
+    try:
+        ask(writer, "write", 1)
+        ask(reader, "read")
+        for value in range(2, rounds + 2):
+            expected = (value, f"Support {value}")
+            ask(reader, "read")  # Cached from here on
+            started = time.perf_counter()
+            ask(writer, "write", value)
+
+            deadline = started + timeout
+            while ask(reader, "read") != expected:
+                if time.perf_counter() > deadline:
+                    stale += 1
+                    break
+                time.sleep(0.005)
+            else:
+                delays.append((time.perf_counter() - started) * 1000)
+    finally:
+        for conn in pipes:
+            conn.send(None)
+        for process in processes:
+            process.join(timeout=10)
+        for inbox in inboxes:
+            inbox.put(None)
+        stop.set()
+        relay_thread.join()
+
+    return {
+        "connected": connected,
+        "rounds": rounds,
+        "stale": stale,
+        "p50_ms": round(statistics.median(delays), 1) if delays else None,
+        "max_ms": round(max(delays), 1) if delays else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=3.0,
+                        help="seconds worker 1 gets to see a write before it counts as stale")
+    args = parser.parse_args()
+
+    # Storage works relative to the current directory; workers inherit it
+    os.chdir(tempfile.mkdtemp(prefix="guibot-bus-"))
+
+    control = run(1, 1.0, connected=False)
+    print(f"🔌 Buses unconnected: {control['stale']}/{control['rounds']} write(s) left worker 1 stale")
+
+    result = run(args.rounds, args.timeout, connected=True)
+    if result["stale"]:
+        print(f"❌ Buses connected: worker 1 missed {result['stale']}/{result['rounds']} write(s)")
+        sys.exit(1)
+    print(f"✅ Buses connected: worker 1 saw all {result['rounds']} write(s), "
+          f"p50 {result['p50_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Import-time report.
+
+Imports a module (default: bot) in fresh interpreters with
+``python -X importtime`` and prints the median self / cumulative import
+time per module, so changes to the startup import graph can be compared
+run to run.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module cogs.tickets --top 30
+    python benchmarks/import_time.py --project-only --json report.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages/modules that belong to this repository
+PROJECT_PREFIXES = ("bot", "launcher", "cogs", "modals", "tickets", "utils", "views")
+
+
+def _parse(stderr: str) -> dict:
+    """module -> (self_us, cumulative_us) from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return timings
+
+
+def measure(module: str, repeat: int) -> dict:
+    """Median (self_ms, cumulative_ms) per module over ``repeat`` fresh imports."""
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT, capture_output=True, text=True, encoding="utf-8"
+        )
+        if result.returncode != 0:
+            raise SystemExit(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+        runs.append(_parse(result.stderr))
+
+    report = {}
+    for name in runs[0]:
+        samples = [run[name] for run in runs if name in run]
+        report[name] = {
+            "self_ms": round(statistics.median(s[0] for s in samples) / 1000, 2),
+            "cumulative_ms": round(statistics.median(s[1] for s in samples) / 1000, 2)
+        }
+    return report
+
+
+def is_project(name: str) -> bool:
+    return name.split(".")[0] in PROJECT_PREFIXES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="bot")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--project-only", action="store_true", help="only list this repository's modules")
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    report = measure(args.module, args.repeat)
+    total = report.get(args.module, {}).get("cumulative_ms", 0.0)
+
+    rows = [(name, t) for name, t in report.items() if not args.project_only or is_project(name)]
+    rows.sort(key=lambda row: row[1]["cumulative_ms"], reverse=True)
+
+    print(f"⏱  import {args.module}: {total:.1f} ms (median of {args.repeat})")
+    print(f"   {'module':<50} {'self ms':>9} {'cumul. ms':>10}")
+    for name, t in rows[:args.top]:
+        print(f"   {name:<50} {t['self_ms']:>9.2f} {t['cumulative_ms']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"module": args.module, "repeat": args.repeat, "modules": report}, f, indent=4)
+        print(f"✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Panel editor save after a send / click.
+
+Opens a panel in TicketPanelEditorView (the way /ticket panel edit does),
+then runs /ticket panel send for that panel and clicks a dropdown posted
+by an old version (shared "panel_dropdown" custom_id, legacy_{index}
+values) on real discord.py objects with the stub HTTP client from
+close_latency.py. Neither changes the panel, so saving the editor
+afterwards must succeed instead of reporting that someone else changed
+it. Exits with status 1 otherwise.
+
+    python benchmarks/panel_editor_revision.py
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from close_latency import (
+    BOT_ID, GUILD_ID, OWNER_ID, REPO_ROOT, _Followup, _channel, _member, _message, make_guild, make_http
+)
+
+PANEL_CHANNEL_ID = GUILD_ID + 30
+LEGACY_MESSAGE_ID = GUILD_ID + 31
+LABELS = ["Support", "Info"]
+
+
+async def _no_delay():
+    pass
+
+
+class _Response:
+    """Interaction response that remembers what was sent."""
+
+    def __init__(self):
+        self._done = False
+        self.sent = []
+
+    def is_done(self):
+        return self._done
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        self.sent.append(content)
+
+
+async def run() -> dict:
+    sys.path.insert(0, REPO_ROOT)
+    import discord
+    from cogs.tickets import TicketCog
+    from tickets.panels.panel_editor_view import TicketPanelEditorView
+    from tickets.panels.panel_storage import PanelStorage
+    from tickets.views.ticket_dropdown_view import TicketDropdown
+
+    http = make_http(discord, 0.0, 0.0, {}, random.Random(1))
+    state, guild = make_guild(discord, http, [_channel(PANEL_CHANNEL_ID, "panels")])
+    owner = discord.Member(data=_member(OWNER_ID), guild=guild, state=state)
+    channel = guild.get_channel(PANEL_CHANNEL_ID)
+
+    def interaction(message=None):
+        return SimpleNamespace(
+            guild=guild, guild_id=GUILD_ID, channel=channel, user=owner, message=message,
+            response=_Response(), followup=_Followup(_no_delay)
+        )
+
+    storage = PanelStorage()
+    # Embed options without an embed: a click answers without opening a ticket
+    storage.save_panel(GUILD_ID, "support", {
+        "title": "Support",
+        "style": "dropdown",
+        "options": [{"label": label, "type": "embed"} for label in LABELS]
+    })
+
+    steps = {}
+
+    # /ticket panel edit
+    editor = TicketPanelEditorView(author_id=OWNER_ID, guild_id=GUILD_ID, panel_name="support")
+    editor.panel = await storage.aget_panel(GUILD_ID, "support")
+    revision = editor.panel.get("revision", 0)
+
+    # /ticket panel send
+    send = interaction()
+    await TicketCog.panel_send.callback(TicketCog(None), send, "support", None)
+    steps["send"] = send.followup.sent
+
+    # Click on a dropdown posted before panels had ids
+    legacy_message = discord.Message(state=state, channel=channel, data={
+        **_message(LEGACY_MESSAGE_ID, PANEL_CHANNEL_ID, BOT_ID, ""),
+        "components": [{"type": 1, "components": [{
+            "type": 3, "custom_id": "panel_dropdown", "min_values": 1, "max_values": 1,
+            "options": [{"label": label, "value": f"legacy_{index}"} for index, label in enumerate(LABELS)]
+        }]}]
+    })
+    for _ in range(2):  # Label match, then the remembered message
+        click = interaction(legacy_message)
+        dropdown = TicketDropdown(None)
+        dropdown.item._values = ["legacy_0"]
+        await dropdown.callback(click)
+        steps.setdefault("click", []).extend(click.followup.sent)
+
+    stored = await storage.aget_panel(GUILD_ID, "support")
+    steps["revision"] = [revision, stored.get("revision", 0)]
+
+    # Save in the editor
+    save = interaction()
+    await editor.save_panel.callback(save)
+    steps["save"] = save.response.sent
+
+    editor.stop()
+    return steps
+
+
+def main():
+    # Panel storage works relative to the current directory
+    os.chdir(tempfile.mkdtemp(prefix="guibot-editor-"))
+    steps = asyncio.run(run())
+
+    checks = {
+        "panel send": ("send", bool(steps["send"]) and steps["send"][-1].startswith("✅")),
+        "legacy dropdown click (x2)": ("click", steps["click"] == ["❌ No embed linked to this option."] * 2),
+        "panel revision unchanged": ("revision", steps["revision"][0] == steps["revision"][1]),
+        "editor save": ("save", bool(steps["save"]) and steps["save"][-1].startswith("✅"))
+    }
+    for name, (step, ok) in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+        if not ok:
+            for line in steps[step]:
+                print(f"   {line}")
+    if not all(ok for _, ok in checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Event-loop lag under a slow storage backend.
+
+Swaps SettingsStorage's backend for one whose every call blocks for
+each of --delays (a slow disk / network file system), fires --calls concurrent
+reads and writes and measures how late a 10 ms ticker on the event loop
+wakes up meanwhile. Runs once per delay, through the async API (run_io)
+and, for comparison, with the blocking calls made on the loop.
+
+With run_io the lag has to stay roughly flat as the backend gets slower;
+the script exits with status 1 if its p99 exceeds --max-lag-ms.
+
+    python benchmarks/storage_loop_lag.py
+    python benchmarks/storage_loop_lag.py --delays 0 50 200 --calls 64
+    python benchmarks/storage_loop_lag.py --no-blocking --json report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICK_S = 0.01
+
+
+class SlowBackend:
+    """In-memory stand-in for SqliteStorage where every call blocks."""
+
+    def __init__(self, delay_s: float):
+        self.delay_s = delay_s
+        self._rows = {}  # (table, guild_id) -> {name: value}
+
+    def get(self, table: str, guild_id: int, name: str):
+        time.sleep(self.delay_s)
+        return self._rows.get((table, guild_id), {}).get(name)
+
+    def load_all(self, table: str, guild_id: int) -> dict:
+        time.sleep(self.delay_s)
+        return dict(self._rows.get((table, guild_id), {}))
+
+    def upsert(self, table: str, guild_id: int, name: str, data):
+        time.sleep(self.delay_s)
+        self._rows.setdefault((table, guild_id), {})[name] = data
+
+
+async def _ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_S)
+        lags.append((time.perf_counter() - started - TICK_S) * 1000)
+
+
+async def measure(delay_ms: float, calls: int, use_run_io: bool) -> dict:
+    from utils.settings_storage import SettingsStorage
+
+    storage = SettingsStorage()
+    storage.db = SlowBackend(delay_ms / 1000)
+
+    async def call(index: int):
+        guild_id = index % 8
+        if use_run_io:
+            if index % 2:
+                await storage.aset(guild_id, f"key{index}", index)
+            else:
+                await storage.aget(guild_id, f"key{index - 1}")
+        else:
+            if index % 2:
+                storage.set(guild_id, f"key{index}", index)
+            else:
+                storage.get(guild_id, f"key{index - 1}")
+            await asyncio.sleep(0)
+
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK_S * 2)  # Let the ticker settle
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    lags = lags or [0.0]
+    return {
+        "delay_ms": delay_ms,
+        "mode": "run_io" if use_run_io else "blocking",
+        "calls": calls,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "lag_p50_ms": round(statistics.median(lags), 2),
+        "lag_p99_ms": round(statistics.quantiles(lags, n=100, method="inclusive")[98] if len(lags) > 1 else lags[0], 2),
+        "lag_max_ms": round(max(lags), 2)
+    }
+
+
+async def run(args) -> list:
+    sys.path.insert(0, REPO_ROOT)
+    results = []
+    for delay_ms in args.delays:
+        results.append(await measure(delay_ms, args.calls, use_run_io=True))
+        if not args.no_blocking:
+            results.append(await measure(delay_ms, args.calls, use_run_io=False))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delays", type=float, nargs="+", default=[0, 20, 100],
+                        help="simulated backend latency per call, in ms")
+    parser.add_argument("--calls", type=int, default=32, help="concurrent storage calls per run")
+    parser.add_argument("--max-lag-ms", type=float, default=25.0,
+                        help="fail if the run_io p99 loop lag exceeds this")
+    parser.add_argument("--no-blocking", action="store_true", help="skip the blocking comparison runs")
+    parser.add_argument("--json", help="also write the result to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"⏱️ Event-loop lag, {args.calls} concurrent settings call(s) per run")
+    for result in results:
+        print(f"   {result['delay_ms']:>6.0f} ms backend  {result['mode']:<8}  "
+              f"lag p50 {result['lag_p50_ms']:6.2f} ms  p99 {result['lag_p99_ms']:7.2f} ms  "
+              f"max {result['lag_max_ms']:7.2f} ms  ({result['elapsed_ms']:.0f} ms total)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"params": vars(args), "results": results}, f, indent=4)
+        print(f"✅ Report written to {args.json}")
+
+    too_slow = [r for r in results if r["mode"] == "run_io" and r["lag_p99_ms"] > args.max_lag_ms]
+    if too_slow:
+        worst = max(too_slow, key=lambda r: r["lag_p99_ms"])
+        print(f"❌ run_io loop lag p99 {worst['lag_p99_ms']:.2f} ms at {worst['delay_ms']:.0f} ms "
+              f"backend latency (limit {args.max_lag_ms:.0f} ms)")
+        sys.exit(1)
+    print(f"✅ run_io loop lag stayed under {args.max_lag_ms:.0f} ms at every backend latency")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+REST calls per ticket open.
+
+Runs TicketManager.create_ticket on real discord.py objects whose HTTP
+client is the stub from close_latency.py, and checks that opening a
+ticket takes exactly two REST calls - both when the channel is created
+and when it's claimed from the pre-warmed pool (TICKET_POOL=1). Also
+checks that a failed claim falls back to creating the channel and keeps
+the pool channel. Exits with status 1 otherwise.
+
+    python benchmarks/ticket_open_calls.py
+    python benchmarks/ticket_open_calls.py --latency-ms 50 --verbose
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from types import SimpleNamespace
+
+from close_latency import (
+    GUILD_ID, OWNER_ID, REPO_ROOT, _Followup, _Response, _channel, _member, make_guild, make_http
+)
+
+CATEGORY_ID = GUILD_ID + 20
+POOL_CHANNEL_ID = GUILD_ID + 21
+LOBBY_CHANNEL_ID = GUILD_ID + 22
+
+EXPECTED = {
+    "create": ["POST /guilds/{guild_id}/channels", "POST /channels/{channel_id}/messages"],
+    "pool": ["PATCH /channels/{channel_id}", "POST /channels/{channel_id}/messages"],
+    "pool_error": ["PATCH /channels/{channel_id}", "POST /guilds/{guild_id}/channels",
+                   "POST /channels/{channel_id}/messages"]
+}
+
+
+async def run(args) -> dict:
+    sys.path.insert(0, REPO_ROOT)
+    import discord
+    import tickets.channel_pool as pool_module
+    from tickets.channel_pool import POOL_CHANNEL_NAME, POOL_TOPIC_PREFIX, channel_pool
+    from tickets.panels.panel_storage import PanelStorage
+    from tickets.ticket_manager import TicketManager
+    from utils.api_calls import count_api_calls, install
+
+    rng = random.Random(args.seed)
+    http = make_http(discord, args.latency_ms, 0.25, {}, rng)
+    stub_request = http.request
+    failing = set()  # HTTP methods answered with a 500
+
+    async def request(route, **kwargs):
+        if route.method in failing:
+            raise discord.HTTPException(SimpleNamespace(status=500, reason="Stubbed failure"), "")
+        return await stub_request(route, **kwargs)
+
+    http.request = request
+    install(http)
+
+    state, guild = make_guild(discord, http, [
+        _channel(CATEGORY_ID, "Tickets", channel_type=4),
+        _channel(LOBBY_CHANNEL_ID, "lobby", parent_id=CATEGORY_ID),
+        _channel(POOL_CHANNEL_ID, POOL_CHANNEL_NAME, f"{POOL_TOPIC_PREFIX}{CATEGORY_ID}", parent_id=CATEGORY_ID)
+    ])
+    owner = discord.Member(data=_member(OWNER_ID), guild=guild, state=state)
+
+    async def interaction_round_trip():
+        await asyncio.sleep(args.latency_ms / 1000)
+
+    option = {"id": "bench", "label": "Support", "panel_name": "support",
+              "category_id": CATEGORY_ID, "pool_size": 1}
+    PanelStorage().save_panel(GUILD_ID, "support", {"title": "Support", "options": [option]})
+
+    results = {}
+    for mode in EXPECTED:
+        # The stub doesn't update the guild cache: the pool channel is
+        # adopted from it again for every pool run
+        channel_pool.drop_guild(GUILD_ID)
+        pool_module.TICKET_POOL = mode != "create"
+        failing.clear()
+        if mode == "pool_error":
+            failing.add("PATCH")
+        interaction = SimpleNamespace(
+            guild=guild,
+            guild_id=GUILD_ID,
+            channel=guild.get_channel(LOBBY_CHANNEL_ID),
+            user=owner,
+            response=_Response(interaction_round_trip),
+            followup=_Followup(interaction_round_trip)
+        )
+        with count_api_calls(f"ticket_open_{mode}") as calls:
+            await TicketManager.create_ticket(interaction, option)
+        results[mode] = calls.calls
+
+    # A failed claim leaves the channel in the pool
+    if POOL_CHANNEL_ID not in channel_pool._channels[(GUILD_ID, CATEGORY_ID)]:
+        results["pool_error"] = results["pool_error"] + ["(pool channel dropped)"]
+
+    channel_pool.drop_guild(GUILD_ID)  # Stop the refill task
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mean simulated REST round trip")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--verbose", action="store_true", help="list the REST calls of each open")
+    args = parser.parse_args()
+
+    # Panel/settings storage works relative to the current directory
+    os.chdir(tempfile.mkdtemp(prefix="guibot-open-"))
+    results = asyncio.run(run(args))
+
+    failed = False
+    for mode, calls in results.items():
+        ok = calls == EXPECTED[mode]
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} ticket open ({mode}): {len(calls)} REST call(s)")
+        if args.verbose or not ok:
+            for call in calls:
+                print(f"   {call}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,51 @@
 import discord
-from discord.ext import commands
 import os
 from dotenv import load_dotenv
 
+# Load environment variables before importing modules that read settings
+# (e.g. cache sizes) at import time
+load_dotenv()
+
 from tickets.panels.panel_storage import PanelStorage
-from tickets.views.ticket_button_view import TicketButtonView
-from tickets.ticket_manager import TicketCloseView
-from tickets.views.ticket_dropdown_view import TicketDropdownView
+from tickets.views.ticket_button_view import TicketButton
+from tickets.channel_pool import channel_pool
+from tickets.ticket_index import ticket_index
+from tickets.ticket_manager import TicketCloseView, forget_guild
+from tickets.views.ticket_dropdown_view import TicketDropdown
+from utils.api_calls import install as install_api_counter
+from utils.cache_profile import CACHE_PROFILE, client_options, describe
+from utils.command_sync import sync_commands
+from utils.embed_storage import EmbedStorage
+from utils.guild_hydration import PRIORITY_AVAILABLE, PRIORITY_INTERACTION, hydrator
+from utils.settings_storage import SettingsStorage
+from utils.sharding import (
+    BOT_SHARDED, CLUSTER_WORKER_ID, create_bot, is_primary, owns_guild, shard_tracker
+)
+from utils.storage_startup import close_storage, open_storage, prepare_storage
 
-# Load environment variables
-load_dotenv()
+# Set PRELOAD_GUILD_DATA=1 to warm every storage cache before logging in
+PRELOAD_GUILD_DATA = os.getenv("PRELOAD_GUILD_DATA", "0") == "1"
 
 # ───────────── BOT SETUP ─────────────
-intents = discord.Intents.default()
-intents.guilds = True
+# Intents, member/message caches and chunking come from CACHE_PROFILE
+# (see utils.cache_profile); the default "ticket" profile keeps no member
+# list and no message cache
+cache_options = client_options()
 
-bot = commands.Bot(
+# AutoShardedBot when BOT_SHARDED=1 (see utils.sharding)
+bot = create_bot(
     command_prefix="!",  # required but unused
-    intents=intents,
-    help_command=None
+    help_command=None,
+    **cache_options
 )
 
 
 @bot.event
-async def on_ready():
-    print(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
-    print(f"📊 Connected to {len(bot.guilds)} server(s)")
+async def setup_hook():
+    # Runs once per process, before the gateway connects. on_ready fires
+    # again after every reconnect, so nothing expensive belongs there.
 
     # ───────────── REGISTER PERSISTENT VIEWS ─────────────
-    storage = PanelStorage()
-    registered = 0
-
     bot.add_view(
         TicketCloseView(
             ticket_owner_id=0,
@@ -40,51 +55,41 @@ async def on_ready():
     )
     print("🔁 Registered persistent TicketCloseView")    
 
-    for guild in bot.guilds:
-        panels_dict = storage.load_panels(guild.id)
-
-        for panel_name in panels_dict.keys():
-            # Use get_panel to ensure integrity (adds missing IDs and saves if needed)
-            panel = storage.get_panel(guild.id, panel_name)
-            if not panel:
-                continue
-            
-            options = panel.get("options", [])
-            if not options:
-                continue
-
-            style = panel.get("style", "buttons")
-
-            if style == "dropdown":
-                bot.add_view(
-                    TicketDropdownView(
-                        guild_id=guild.id,
-                        panel_name=panel_name
-                    )
-                )
-            else:
-                bot.add_view(
-                    TicketButtonView(
-                        guild_id=guild.id,
-                        panel_name=panel_name
-                    )
-                )
+    # Every posted panel (any guild, any number of panels) is routed by
+    # these two handlers; options are looked up when clicked
+    bot.add_dynamic_items(TicketButton, TicketDropdown)
+    print("🔁 Registered dynamic panel button/dropdown handlers")
+
+    print(f"🧠 Cache profile '{CACHE_PROFILE}': {describe(cache_options)}")
 
-            registered += 1
-            print(
-                f"🔁 Registered {style} view for panel "
-                f"'{panel_name}' in {guild.name}"
-            )
+    # Per-flow REST call counts (utils.api_calls)
+    install_api_counter(bot.http)
 
-    print(f"✅ Total persistent panels restored: {registered}")
+    # Guild data is loaded lazily (see the guild events below)
+    hydrator.start()
 
     # ───────────── SYNC SLASH COMMANDS ─────────────
+    # Only when the command tree changed (/sync-commands forces it), and
+    # only from one process of a cluster
+    if not is_primary():
+        return
     try:
-        synced = await bot.tree.sync()
-        print(f"🔄 Synced {len(synced)} command(s)")
+        synced = await sync_commands(bot)
+        if synced is None:
+            print("🔄 Command tree unchanged, skipped sync")
+        else:
+            print(f"🔄 Synced {synced} command(s)")
     except Exception as e:
         print(f"❌ Failed to sync commands: {e}")
 
+
+@bot.event
+async def on_ready():
+    print(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
+    print(f"📊 Connected to {len(bot.guilds)} server(s)")
+    if not BOT_SHARDED:
+        shard_tracker.mark_ready(0)
+
     # ───────────── BOT STATUS ─────────────
     await bot.change_presence(
         activity=discord.Activity(
@@ -96,9 +101,81 @@ async def on_ready():
     print("✨ Bot is fully ready and stable!")
 
 
+# ───────────── SHARD STATUS ─────────────
+@bot.event
+async def on_shard_ready(shard_id: int):
+    shard_tracker.mark_ready(shard_id)
+    guilds = sum(1 for guild in bot.guilds if guild.shard_id == shard_id)
+    print(f"🧩 Shard {shard_id} ready ({guilds} server(s))")
+
+
+@bot.event
+async def on_shard_resumed(shard_id: int):
+    shard_tracker.mark_ready(shard_id)
+
+
+@bot.event
+async def on_shard_disconnect(shard_id: int):
+    shard_tracker.mark_down(shard_id)
+
+
+@bot.event
+async def on_resumed():
+    if not BOT_SHARDED:
+        shard_tracker.mark_ready(0)
+
+
+@bot.event
+async def on_disconnect():
+    if not BOT_SHARDED:
+        shard_tracker.mark_down(0)
+
+
+# ───────────── LAZY GUILD DATA ─────────────
+@bot.event
+async def on_guild_available(guild: discord.Guild):
+    hydrator.request(guild.id, PRIORITY_AVAILABLE)
+    # Adopts leftover pool channels (no-op unless TICKET_POOL=1)
+    await channel_pool.warm(guild)
+
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    hydrator.request(guild.id, PRIORITY_AVAILABLE)
+
+
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    # Jumps the queue; the interaction itself never waits for this
+    hydrator.request(interaction.guild_id, PRIORITY_INTERACTION)
+
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    hydrator.evict(guild.id)
+    ticket_index.drop_guild(guild.id)
+    forget_guild(guild.id)
+    channel_pool.drop_guild(guild.id)
+
+
+# ───────────── OPEN TICKET INDEX ─────────────
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    # Topic edits, renames to closed-*, ...
+    if isinstance(after, discord.TextChannel):
+        ticket_index.add(after)
+
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    ticket_index.remove(channel.guild.id, channel.id)
+    channel_pool.discard(channel.guild.id, channel.id)
+
+
 # ───────────── LOAD COGS ─────────────
 async def load_cogs():
     cogs_to_load = [
+        "cogs.admin",
         "cogs.embed",
         "cogs.tickets"
     ]
@@ -121,7 +198,33 @@ async def main():
             print("❌ ERROR: DISCORD_TOKEN not found in .env file")
             return
 
-        await bot.start(token)
+        # ───────────── STORAGE ─────────────
+        # Migrations + snapshot rebuild; under launcher.py they already
+        # ran once for the whole cluster
+        if CLUSTER_WORKER_ID is None:
+            prepare_storage()
+        else:
+            open_storage()
+
+        # ───────────── PRELOAD ─────────────
+        if PRELOAD_GUILD_DATA:
+            for kind, storage in (
+                ("panels", PanelStorage()),
+                ("embeds", EmbedStorage()),
+                ("settings", SettingsStorage())
+            ):
+                # Only the guilds of the shards this process runs
+                stats = storage.preload(guild_filter=owns_guild)
+                print(
+                    f"📥 Preloaded {stats['files']} {kind} file(s) in {stats['seconds']:.2f}s "
+                    f"({stats['files_per_sec']:.0f}/s, {stats['errors']} error(s))"
+                )
+
+        try:
+            await bot.start(token)
+        finally:
+            # The launcher rebuilds the snapshot once all workers stopped
+            close_storage(rebuild_snapshot=CLUSTER_WORKER_ID is None)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import math
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.command_sync import sync_commands
+from utils.sharding import shard_tracker
+
+
+class AdminCog(commands.Cog):
+    """
+    Bot maintenance and status commands for server admins / the bot owner.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ===============================
+    # /sync-commands
+    # ===============================
+    @app_commands.command(
+        name="sync-commands",
+        description="Force a resync of the bot's slash commands (bot owner only)"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def sync_commands_cmd(self, interaction: discord.Interaction):
+        # Global sync affects every server, so guild admins aren't enough
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "❌ Only the bot owner can sync commands.",
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            count = await sync_commands(self.bot, force=True)
+        except discord.HTTPException as e:
+            await interaction.followup.send(
+                f"❌ Failed to sync commands: {e}",
+                ephemeral=True
+            )
+            return
+
+        await interaction.followup.send(
+            f"🔄 Synced {count} command(s).",
+            ephemeral=True
+        )
+
+    # ===============================
+    # /bot-status
+    # ===============================
+    @app_commands.command(
+        name="bot-status",
+        description="Show readiness, latency and server count per shard"
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def status_cmd(self, interaction: discord.Interaction):
+        rows = shard_tracker.status(self.bot)
+
+        lines = [
+            f"{'🟢' if row['ready'] else '🔴'} **Shard {row['id']}** — "
+            f"{_format_latency(row['latency'])}, {row['guilds']} server(s)"
+            for row in rows
+        ]
+        embed = discord.Embed(
+            title="🧩 Shard Status",
+            description="\n".join(lines[:50]) or "No shards connected.",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"{len(self.bot.guilds)} server(s) across {len(rows)} shard(s)")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+def _format_latency(seconds: float) -> str:
+    # discord.py reports inf (or nan) until a shard's first heartbeat ack
+    return f"{seconds * 1000:.0f} ms" if math.isfinite(seconds) else "n/a"
+
+
+async def setup(bot):
+    """Load the AdminCog."""
+    await bot.add_cog(AdminCog(bot))
@@ -2,7 +2,6 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from views.embed_editor_view import EmbedEditorView
 from utils.embed_storage import EmbedStorage
 from views.link_button_view import LinkButtonView
 
@@ -47,6 +46,9 @@ class EmbedCog(commands.Cog):
             )
             return
 
+        # Editor UI (and its modals) is loaded on first use, not at startup
+        from views.embed_editor_view import EmbedEditorView
+
         editor = EmbedEditorView(
             author_id=interaction.user.id,
             embed_name=embed_name,
@@ -89,7 +91,7 @@ class EmbedCog(commands.Cog):
             )
             return
 
-        embed_state = self.storage.load_embed(
+        embed_state = await self.storage.aload_embed(
             interaction.guild.id,
             embed_name
         )
@@ -101,6 +103,8 @@ class EmbedCog(commands.Cog):
             )
             return
 
+        from views.embed_editor_view import EmbedEditorView
+
         editor = EmbedEditorView(
             author_id=interaction.user.id,
             embed_name=embed_name,
@@ -140,7 +144,7 @@ class EmbedCog(commands.Cog):
             )
             return
 
-        embed_names = self.storage.list_embeds(
+        embed_names = await self.storage.alist_embeds(
             interaction.guild.id
         )
 
@@ -194,7 +198,7 @@ class EmbedCog(commands.Cog):
             )
             return
 
-        success = self.storage.delete_embed(
+        success = await self.storage.adelete_embed(
             interaction.guild.id,
             embed_name
         )
@@ -241,7 +245,7 @@ class EmbedCog(commands.Cog):
             )
             return
 
-        embed_state = self.storage.load_embed(
+        embed_state = await self.storage.aload_embed(
             interaction.guild.id,
             embed_name
         )
@@ -253,6 +257,8 @@ class EmbedCog(commands.Cog):
             )
             return
 
+        from views.embed_editor_view import EmbedEditorView
+
         editor = EmbedEditorView(
             author_id=interaction.user.id,
             embed_name=embed_name,
@@ -290,7 +296,7 @@ class EmbedCog(commands.Cog):
         if not interaction.guild:
             return []
 
-        embed_names = self.storage.list_embeds(
+        embed_names = await self.storage.alist_embeds(
             interaction.guild.id
         )
 
@@ -2,17 +2,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from modals.embed_modals import ColorModal
-from tickets.panels.panel_editor_view import TicketPanelEditorView
+from tickets.channel_pool import POOL_MAX_PER_CATEGORY, TICKET_POOL, channel_pool
 from tickets.panels.panel_storage import PanelStorage
 from tickets.views.ticket_button_view import TicketButtonView
 from tickets.views.ticket_dropdown_view import TicketDropdownView
+from utils.settings_storage import SettingsStorage
 
 
 class TicketCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.storage = PanelStorage()
+        self.settings = SettingsStorage()
 
     # ===============================
     # /ticket
@@ -48,13 +49,15 @@ class TicketCog(commands.Cog):
             )
             return
 
-        if self.storage.get_panel(interaction.guild.id, name):
+        if await self.storage.aget_panel(interaction.guild.id, name):
             await interaction.response.send_message(
                 f"❌ Panel **{name}** already exists.",
                 ephemeral=True
             )
             return
 
+        from tickets.panels.panel_editor_view import TicketPanelEditorView
+
         view = TicketPanelEditorView(
             author_id=interaction.user.id,
             guild_id=interaction.guild.id,
@@ -70,7 +73,7 @@ class TicketCog(commands.Cog):
     # ───────────── EDIT PANEL ─────────────
     @panel.command(name="edit")
     async def panel_edit(self, interaction: discord.Interaction, name: str):
-        panel = self.storage.get_panel(interaction.guild.id, name)
+        panel = await self.storage.aget_panel(interaction.guild.id, name)
         if not panel:
             await interaction.response.send_message(
                 f"❌ Panel **{name}** not found.",
@@ -78,6 +81,8 @@ class TicketCog(commands.Cog):
             )
             return
 
+        from tickets.panels.panel_editor_view import TicketPanelEditorView
+
         view = TicketPanelEditorView(
             author_id=interaction.user.id,
             guild_id=interaction.guild.id,
@@ -94,7 +99,7 @@ class TicketCog(commands.Cog):
     # ───────────── LIST PANELS ─────────────
     @panel.command(name="list")
     async def panel_list(self, interaction: discord.Interaction):
-        panels = self.storage.load_panels(interaction.guild.id)
+        panels = await self.storage.aload_panels(interaction.guild.id)
         if not panels:
             await interaction.response.send_message(
                 "❌ No ticket panels created yet.",
@@ -113,17 +118,13 @@ class TicketCog(commands.Cog):
     # ───────────── DELETE PANEL ─────────────
     @panel.command(name="delete")
     async def panel_delete(self, interaction: discord.Interaction, name: str):
-        panels = self.storage.load_panels(interaction.guild.id)
-        if name not in panels:
+        if not await self.storage.adelete_panel(interaction.guild.id, name):
             await interaction.response.send_message(
                 f"❌ Panel **{name}** not found.",
                 ephemeral=True
             )
             return
 
-        panels.pop(name)
-        self.storage.save_panels(interaction.guild.id, panels)
-
         await interaction.response.send_message(
             f"🗑 Deleted panel **{name}**.",
             ephemeral=True
@@ -139,7 +140,7 @@ class TicketCog(commands.Cog):
     ):
         await interaction.response.defer(ephemeral=True)
 
-        panel = self.storage.get_panel(interaction.guild.id, name)
+        panel = await self.storage.aget_panel(interaction.guild.id, name)
         if not panel:
             await interaction.followup.send(
                 f"❌ Panel **{name}** not found.",
@@ -150,6 +151,8 @@ class TicketCog(commands.Cog):
         target_channel = channel or interaction.channel
 
         try:
+            from modals.embed_modals import ColorModal
+
             color = ColorModal.parse_color(panel.get("color", ""))
             embed = discord.Embed(
                 title=panel.get("title"),
@@ -185,17 +188,14 @@ class TicketCog(commands.Cog):
                 return
 
             if panel.get("style") == "dropdown" and len(options) > 1:
-                view = TicketDropdownView(
-                    guild_id=interaction.guild.id,
-                    panel_name=name
-                )
+                view = TicketDropdownView(panel)
             else:
-                view = TicketButtonView(
-                    guild_id=interaction.guild.id,
-                    panel_name=name
-                )
+                view = TicketButtonView(panel)
 
             await target_channel.send(embed=embed, view=view)
+            # Clicks are routed by the dynamic handlers registered in
+            # setup_hook; don't keep a per-message copy of this view around
+            view.stop()
 
         except Exception as e:
             print("❌ PANEL SEND ERROR:", e)
@@ -221,7 +221,7 @@ class TicketCog(commands.Cog):
         panel_name: str,
         channel: discord.TextChannel
     ):
-        panel = self.storage.get_panel(interaction.guild.id, panel_name)
+        panel = await self.storage.aget_panel(interaction.guild.id, panel_name)
         if not panel:
             await interaction.response.send_message(
                 f"❌ Panel **{panel_name}** not found.",
@@ -236,14 +236,87 @@ class TicketCog(commands.Cog):
             )
             return
 
-        panel["transcript_channel_id"] = channel.id
-        self.storage.save_panel(interaction.guild.id, panel_name, panel)
+        def set_transcript(latest: dict):
+            latest["transcript_channel_id"] = channel.id
+
+        # Retries on top of the latest revision if someone else saved meanwhile
+        await self.storage.aupdate_panel(interaction.guild.id, panel_name, set_transcript)
 
         await interaction.response.send_message(
             f"✅ Transcript channel for **{panel_name}** set to {channel.mention}",
             ephemeral=True
         )
 
+    # ===============================
+    # /ticket set-pool
+    # ===============================
+    @ticket.command(name="set-pool")
+    @app_commands.default_permissions(administrator=True)
+    async def set_pool_size(
+        self,
+        interaction: discord.Interaction,
+        panel_name: str,
+        option: str,
+        size: app_commands.Range[int, 0, POOL_MAX_PER_CATEGORY]
+    ):
+        """Keep hidden pre-created channels ready for an option (0 turns it off)"""
+        panel = await self.storage.aget_panel(interaction.guild.id, panel_name)
+        if not panel:
+            await interaction.response.send_message(
+                f"❌ Panel **{panel_name}** not found.",
+                ephemeral=True
+            )
+            return
+
+        target = next(
+            (o for o in panel.get("options", []) if o.get("label", "").lower() == option.lower()),
+            None
+        )
+        if target is None or target.get("type", "ticket") != "ticket":
+            await interaction.response.send_message(
+                f"❌ Panel **{panel_name}** has no ticket option **{option}**.",
+                ephemeral=True
+            )
+            return
+        if size and not target.get("category_id"):
+            await interaction.response.send_message(
+                f"❌ Set a category for **{option}** first; pooled channels are kept in it.",
+                ephemeral=True
+            )
+            return
+
+        # Options sharing a category share its pool
+        if size:
+            panels = await self.storage.aget_all_panels(interaction.guild.id)
+            shared = sum(
+                int(opt.get("pool_size") or 0)
+                for other in panels.values()
+                for opt in other.get("options", [])
+                if opt.get("category_id") == target["category_id"] and opt.get("id") != target.get("id")
+            )
+            if shared + size > POOL_MAX_PER_CATEGORY:
+                await interaction.response.send_message(
+                    f"❌ Pools in this category are limited to **{POOL_MAX_PER_CATEGORY}** channels in total "
+                    f"(**{shared}** already used by other options), so there's room left for tickets.",
+                    ephemeral=True
+                )
+                return
+
+        def set_pool(latest: dict):
+            for opt in latest.get("options", []):
+                if opt.get("id") == target.get("id"):
+                    opt["pool_size"] = size
+
+        await self.storage.aupdate_panel(interaction.guild.id, panel_name, set_pool)
+        await interaction.response.send_message(
+            f"✅ Channel pool for **{option}** set to **{size}**"
+            + ("" if TICKET_POOL else " (takes effect once the bot runs with `TICKET_POOL=1`)"),
+            ephemeral=True
+        )
+
+        # Starts filling (or shrinking) the pool right away
+        await channel_pool.configure(interaction.guild)
+
     # ===============================
     # /ticket view-config
     # ===============================
@@ -254,7 +327,7 @@ class TicketCog(commands.Cog):
         interaction: discord.Interaction,
         panel_name: str
     ):
-        panel = self.storage.get_panel(interaction.guild.id, panel_name)
+        panel = await self.storage.aget_panel(interaction.guild.id, panel_name)
         if not panel:
             await interaction.response.send_message(
                 f"❌ Panel **{panel_name}** not found.",
@@ -309,23 +382,8 @@ class TicketCog(commands.Cog):
             )
             return
 
-        # Store support team role ID in panel storage
-        # Create a settings file if needed
-        import json
-        import os
-        settings_dir = "data/settings"
-        os.makedirs(settings_dir, exist_ok=True)
-        settings_file = os.path.join(settings_dir, f"{interaction.guild.id}.json")
-
-        settings = {}
-        if os.path.exists(settings_file):
-            with open(settings_file, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-
-        settings["support_team_role_id"] = role.id
-        
-        with open(settings_file, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=4, ensure_ascii=False)
+        # Store support team role ID in guild settings
+        await self.settings.aset(interaction.guild.id, "support_team_role_id", role.id)
 
         await interaction.response.send_message(
             f"Support team role set to {role.mention}.\n"
@@ -344,21 +402,8 @@ class TicketCog(commands.Cog):
             )
             return
 
-        import json
-        import os
-        settings_file = os.path.join("data/settings", f"{interaction.guild.id}.json")
-
-        if not os.path.exists(settings_file):
-            await interaction.response.send_message(
-                "No support team role has been set yet. Use `/ticket support-team set` to configure one.",
-                ephemeral=True
-            )
-            return
-
-        with open(settings_file, "r", encoding="utf-8") as f:
-            settings = json.load(f)
-
-        role_id = settings.get("support_team_role_id")
+        settings = await self.settings.aget_guild_settings(interaction.guild.id)
+        role_id = settings.support_team_role_id
         if not role_id:
             await interaction.response.send_message(
                 "No support team role has been set yet. Use `/ticket support-team set` to configure one.",
@@ -392,21 +437,8 @@ class TicketCog(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        import json
-        import os
-        settings_file = os.path.join("data/settings", f"{interaction.guild.id}.json")
-
-        if not os.path.exists(settings_file):
-            await interaction.followup.send(
-                "No support team role has been set yet. Use `/ticket support-team set` to configure one.",
-                ephemeral=True
-            )
-            return
-
-        with open(settings_file, "r", encoding="utf-8") as f:
-            settings = json.load(f)
-
-        role_id = settings.get("support_team_role_id")
+        settings = await self.settings.aget_guild_settings(interaction.guild.id)
+        role_id = settings.support_team_role_id
         if not role_id:
             await interaction.followup.send(
                 "No support team role has been set yet. Use `/ticket support-team set` to configure one.",
@@ -455,7 +487,7 @@ class TicketCog(commands.Cog):
         interaction: discord.Interaction,
         current: str
     ):
-        panels = self.storage.load_panels(interaction.guild.id)
+        panels = await self.storage.aload_panels(interaction.guild.id)
         return [
             app_commands.Choice(name=name, value=name)
             for name in panels
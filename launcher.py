@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load environment variables before importing modules that read settings
+# at import time
+load_dotenv()
+
+from utils.invalidation import relay
+from utils.storage_startup import close_storage, prepare_storage
+
+# ───────────── CLUSTER SETUP ─────────────
+# python launcher.py runs CLUSTER_PROCESSES copies of bot.py, each serving
+# its own contiguous range of SHARD_COUNT shards, against the same data/
+# directory (or SQLite database).
+CLUSTER_PROCESSES = int(os.getenv("CLUSTER_PROCESSES", str(os.cpu_count() or 1)))
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", str(CLUSTER_PROCESSES)))
+
+# Crashed workers are restarted after RESTART_DELAY seconds, doubling up to
+# MAX_RESTART_DELAY while they keep crashing within STABLE_AFTER seconds.
+RESTART_DELAY = float(os.getenv("WORKER_RESTART_DELAY", "5"))
+MAX_RESTART_DELAY = 300.0
+STABLE_AFTER = 60.0
+
+# How long a worker gets to flush its writes on shutdown
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def shard_ranges(shard_count: int, processes: int) -> list[list[int]]:
+    """Split shard ids 0..shard_count-1 into ``processes`` contiguous ranges."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+
+    ranges, start = [], 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def _interrupt_once(*_):
+    # Turn SIGTERM into KeyboardInterrupt so asyncio.run unwinds and
+    # bot.main's finally block flushes the write-behind buffer
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+def _run_worker(worker_id: int, shard_ids: list[int], shard_count: int, outbox, inbox):
+    """Worker process entry point: bot.py restricted to ``shard_ids``."""
+    # utils.sharding reads these at import time
+    os.environ["BOT_SHARDED"] = "1"
+    os.environ["SHARD_COUNT"] = str(shard_count)
+    os.environ["SHARD_IDS"] = ",".join(map(str, shard_ids))
+    os.environ["CLUSTER_WORKER_ID"] = str(worker_id)
+
+    # Ctrl+C in the terminal reaches the whole process group; shutdown is
+    # driven by the launcher instead (SIGTERM, handled once)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, _interrupt_once)
+
+    from utils.invalidation import bus
+    bus.connect(worker_id, outbox, inbox)
+
+    import asyncio
+    import bot
+
+    try:
+        asyncio.run(bot.main())
+    except KeyboardInterrupt:
+        pass
+
+
+class Worker:
+    def __init__(self, worker_id: int, shard_ids: list[int], inbox):
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids
+        self.inbox = inbox
+        self.process = None
+        self.started_at = 0.0
+        self.restart_delay = RESTART_DELAY
+        self.restart_at = None
+
+    @property
+    def label(self) -> str:
+        return f"worker {self.worker_id} (shards {self.shard_ids[0]}-{self.shard_ids[-1]})"
+
+    def start(self, ctx, shard_count: int, outbox):
+        self.process = ctx.Process(
+            target=_run_worker,
+            args=(self.worker_id, self.shard_ids, shard_count, outbox, self.inbox),
+            name=f"guibot-worker-{self.worker_id}"
+        )
+        self.process.start()
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        print(f"🚀 Started {self.label} (pid {self.process.pid})")
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()  # SIGTERM -> _interrupt_once
+
+
+def main():
+    ctx = multiprocessing.get_context("spawn")
+    ranges = shard_ranges(SHARD_COUNT, CLUSTER_PROCESSES)
+
+    # Migrations and snapshot rebuild run once here, not in every worker
+    prepare_storage()
+
+    # Storage invalidations: every worker publishes into outbox, the relay
+    # thread copies each message into every worker's inbox
+    outbox = ctx.Queue()
+    workers = [Worker(index, shard_ids, ctx.Queue()) for index, shard_ids in enumerate(ranges)]
+    stop = threading.Event()
+    relay_thread = threading.Thread(
+        target=relay,
+        args=(outbox, [worker.inbox for worker in workers], stop),
+        name="invalidation-relay",
+        daemon=True
+    )
+    relay_thread.start()
+
+    print(f"🧩 Launching {len(workers)} worker(s) for {SHARD_COUNT} shard(s)")
+    for worker in workers:
+        worker.start(ctx, SHARD_COUNT, outbox)
+
+    def _request_stop(*_):
+        stop.set()
+
+    signal.signal(signal.SIGINT, _request_stop)
+    signal.signal(signal.SIGTERM, _request_stop)
+
+    # ───────────── MONITOR ─────────────
+    try:
+        while not stop.wait(1.0):
+            now = time.monotonic()
+            for worker in workers:
+                if worker.process.is_alive():
+                    continue
+
+                if worker.restart_at is None:
+                    if now - worker.started_at >= STABLE_AFTER:
+                        worker.restart_delay = RESTART_DELAY
+                    print(
+                        f"💥 {worker.label} exited with code {worker.process.exitcode}; "
+                        f"restarting in {worker.restart_delay:.0f}s"
+                    )
+                    worker.restart_at = now + worker.restart_delay
+                    worker.restart_delay = min(worker.restart_delay * 2, MAX_RESTART_DELAY)
+                elif now >= worker.restart_at:
+                    worker.start(ctx, SHARD_COUNT, outbox)
+    finally:
+        print("🛑 Stopping workers...")
+        for worker in workers:
+            worker.stop()
+
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for worker in workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                print(f"⚠️ {worker.label} didn't stop in time, killing it")
+                worker.process.kill()
+                worker.process.join()
+
+        stop.set()
+        # All workers flushed; fold their changes into the snapshot
+        close_storage()
+        print("✅ Cluster stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import asyncio
+import contextvars
+import math
+import os
+import time
+from collections import defaultdict
+
+import discord
+
+from tickets.panels.panel_storage import PanelStorage
+
+# TICKET_POOL=1 keeps hidden, pre-created channels in the category of every
+# ticket option with a "pool_size" (see /ticket set-pool). Opening a ticket
+# then renames and unlocks one of them instead of creating a channel, so
+# bursts aren't held up by Discord's channel-create rate limit.
+TICKET_POOL = os.getenv("TICKET_POOL", "0") == "1"
+
+# Seconds between two channel creates/deletes of the pool in one guild
+POOL_REFILL_DELAY = float(os.getenv("TICKET_POOL_REFILL_DELAY", "10"))
+
+# A pool is kept at its full size while tickets were claimed from it in
+# the last POOL_IDLE_TIMEOUT seconds; after that the surplus is deleted
+# down to a quarter of the size (at least one channel)
+POOL_IDLE_TIMEOUT = float(os.getenv("TICKET_POOL_IDLE_TIMEOUT", "1800"))
+
+# Discord allows 50 channels per category. Pools sharing a category are
+# capped at POOL_MAX_PER_CATEGORY channels in total, and no pool channel
+# is created once the category has only that many free slots left: they
+# are kept for the tickets themselves.
+CATEGORY_CHANNEL_LIMIT = 50
+POOL_MAX_PER_CATEGORY = min(int(os.getenv("TICKET_POOL_MAX_PER_CATEGORY", "10")), CATEGORY_CHANNEL_LIMIT // 2)
+
+# Channel creates failing with one of these won't succeed on a retry
+MAX_GUILD_CHANNELS = 30013  # Guild has 500 channels
+INVALID_FORM_BODY = 50035   # Also returned for a full category
+
+# Pool channels are recognised by name and topic, also after a restart
+POOL_CHANNEL_NAME = "ticket-pool"
+POOL_TOPIC_PREFIX = "pool:"
+
+
+def idle_size(size: int) -> int:
+    return min(size, max(1, math.ceil(size / 4)))
+
+
+class ChannelPool:
+    """
+    Hidden ticket channels per (guild, category), refilled by one paced
+    background task per guild.
+    """
+
+    def __init__(self):
+        self._channels = defaultdict(list)  # (guild_id, category_id) -> [channel_id, ...]
+        self._sizes = {}                    # (guild_id, category_id) -> full pool size
+        self._last_claim = {}               # (guild_id, category_id) -> time.monotonic()
+        self._configured = set()            # guild ids whose sizes were read from the panels
+        self._tasks = {}                    # guild_id -> maintenance task
+        self._wakeups = {}                  # guild_id -> asyncio.Event, set on claims/config
+        self._halted = set()                # guild ids where the bot lacks permissions
+
+    # ===============================
+    # CONFIGURATION
+    # ===============================
+    async def configure(self, guild: discord.Guild, active: bool = True):
+        """
+        (Re)read the pool sizes from the guild's panels: options sharing a
+        category share one pool of the summed size (at most
+        POOL_MAX_PER_CATEGORY). Adopts pool channels
+        left over from a previous run and starts filling the pool - to
+        its full size when ``active`` (e.g. right after /ticket set-pool),
+        otherwise to its idle size.
+        """
+        if not TICKET_POOL:
+            return
+
+        sizes = defaultdict(int)
+        panels = await PanelStorage().aget_all_panels(guild.id)
+        for panel in panels.values():
+            for option in panel.get("options", []):
+                if option.get("type", "ticket") == "ticket" and option.get("pool_size") and option.get("category_id"):
+                    sizes[(guild.id, int(option["category_id"]))] += int(option["pool_size"])
+
+        for key, size in sizes.items():
+            if size > POOL_MAX_PER_CATEGORY:
+                print(f"⚠️ Ticket pool for category {key[1]} capped at {POOL_MAX_PER_CATEGORY} (configured {size})")
+                sizes[key] = POOL_MAX_PER_CATEGORY
+
+        for key in [key for key in self._sizes if key[0] == guild.id]:
+            del self._sizes[key]
+        self._sizes.update(sizes)
+        self._configured.add(guild.id)
+        self._halted.discard(guild.id)  # Permissions may have been fixed meanwhile
+
+        for channel in guild.text_channels:
+            category_id = self._pool_category(channel)
+            if category_id is not None:
+                key = (guild.id, category_id)
+                if channel.id not in self._channels[key]:
+                    self._channels[key].append(channel.id)
+        if active:
+            now = time.monotonic()
+            for key in sizes:
+                self._last_claim[key] = now
+
+        self._ensure_task(guild)
+
+    async def warm(self, guild: discord.Guild):
+        """Guild came online: configure it if it already has pool channels."""
+        if TICKET_POOL and guild.id not in self._configured:
+            if any(self._pool_category(channel) is not None for channel in guild.text_channels):
+                await self.configure(guild, active=False)
+
+    @staticmethod
+    def _pool_category(channel) -> int | None:
+        topic = channel.topic or ""
+        if channel.name == POOL_CHANNEL_NAME and topic.startswith(POOL_TOPIC_PREFIX):
+            try:
+                return int(topic[len(POOL_TOPIC_PREFIX):])
+            except ValueError:
+                return None
+        return None
+
+    # ===============================
+    # CLAIM
+    # ===============================
+    async def claim(self, guild: discord.Guild, category, option: dict, **edit):
+        """
+        Turn a pooled channel of ``category`` into a ticket with a single
+        edit (``name``, ``topic``, ``overwrites``, ``reason``). Returns the
+        edited channel, or None when there's no pool or it's empty - the
+        caller then creates a channel as usual.
+        """
+        if not TICKET_POOL or category is None:
+            return None
+        if guild.id not in self._configured and option.get("pool_size"):
+            await self.configure(guild)
+
+        key = (guild.id, category.id)
+        if key not in self._sizes:
+            return None
+
+        self._last_claim[key] = time.monotonic()
+        self._ensure_task(guild)
+
+        pool = self._channels[key]
+        while pool:
+            channel = guild.get_channel(pool.pop())
+            if channel is None:
+                continue  # Deleted meanwhile
+            try:
+                return await channel.edit(**edit)
+            except discord.NotFound:
+                continue
+            except discord.HTTPException as e:
+                # Rate limited, missing permissions, Discord error...: the
+                # channel is unchanged, so it goes back to the pool (tried
+                # last) and the ticket gets a freshly created channel
+                print(f"⚠️ Ticket pool claim failed in guild {guild.id}: {e}")
+                pool.insert(0, channel.id)
+                return None
+        return None
+
+    def discard(self, guild_id: int, channel_id: int):
+        """A channel was deleted (on_guild_channel_delete)."""
+        for key, pool in self._channels.items():
+            if key[0] == guild_id and channel_id in pool:
+                pool.remove(channel_id)
+                return
+
+    def drop_guild(self, guild_id: int):
+        task = self._tasks.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+        self._wakeups.pop(guild_id, None)
+        self._halted.discard(guild_id)
+        for mapping in (self._channels, self._sizes, self._last_claim):
+            for key in [key for key in mapping if key[0] == guild_id]:
+                del mapping[key]
+        self._configured.discard(guild_id)
+
+    # ===============================
+    # REFILL / SHRINK
+    # ===============================
+    def target(self, key, now: float) -> int:
+        size = self._sizes.get(key, 0)
+        if now - self._last_claim.get(key, float("-inf")) < POOL_IDLE_TIMEOUT:
+            return size
+        return idle_size(size) if size else 0
+
+    def _ensure_task(self, guild: discord.Guild):
+        if guild.id in self._halted:
+            return
+        task = self._tasks.get(guild.id)
+        if task is None or task.done():
+            self._wakeups[guild.id] = asyncio.Event()
+            # Started from a fresh context: claims run inside the ticket's
+            # count_api_calls() block, the refills aren't part of that flow
+            self._tasks[guild.id] = contextvars.Context().run(
+                asyncio.create_task, self._maintain(guild), name=f"ticket-pool-{guild.id}"
+            )
+        else:
+            self._wakeups[guild.id].set()  # Re-check targets now
+
+    async def _maintain(self, guild: discord.Guild):
+        """One create or delete per POOL_REFILL_DELAY until every pool is on target."""
+        failures = 0  # In a row; other errors back off up to 64x the delay
+        while True:
+            now = time.monotonic()
+            step = None
+            next_check = None
+            for key in {*self._sizes, *self._channels}:
+                if key[0] != guild.id:
+                    continue
+                have, want = len(self._channels[key]), self.target(key, now)
+                if have < want:
+                    step = ("create", key)
+                    break
+                if have > want:
+                    step = ("delete", key)
+                    break
+                size = self._sizes.get(key, 0)
+                if size and want > idle_size(size):
+                    # Full pool that shrinks once demand stops
+                    deadline = self._last_claim[key] + POOL_IDLE_TIMEOUT
+                    next_check = deadline if next_check is None else min(next_check, deadline)
+
+            if step is None:
+                if next_check is None:
+                    return
+                wakeup = self._wakeups[guild.id]
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), max(0.0, next_check - now) + 1)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            action, key = step
+            try:
+                if action == "create":
+                    await self._create(guild, key)
+                else:
+                    await self._delete(guild, key)
+            except discord.Forbidden as e:
+                # Retrying won't help: stop until the pool is reconfigured
+                # (/ticket set-pool or a restart)
+                print(f"⚠️ Ticket pool halted in guild {guild.id}, missing permissions: {e}")
+                self._halted.add(guild.id)
+                return
+            except discord.HTTPException as e:
+                if action == "create" and e.code in (MAX_GUILD_CHANNELS, INVALID_FORM_BODY):
+                    print(f"⚠️ Ticket pool for category {key[1]} stopped growing: {e}")
+                    self._cap(key)
+                else:
+                    print(f"⚠️ Ticket pool {action} failed in guild {guild.id}: {e}")
+                    failures += 1
+            else:
+                failures = 0
+            await asyncio.sleep(POOL_REFILL_DELAY * 2 ** min(failures, 6))
+
+    def _cap(self, key):
+        """Keep the pool at the channels it has until it's reconfigured."""
+        if key in self._sizes:
+            self._sizes[key] = len(self._channels[key])
+
+    async def _create(self, guild: discord.Guild, key):
+        category = guild.get_channel(key[1])
+        if not isinstance(category, discord.CategoryChannel):
+            # Category is gone: stop pooling for it until reconfigured
+            self._sizes.pop(key, None)
+            return
+        if len(category.channels) >= CATEGORY_CHANNEL_LIMIT - POOL_MAX_PER_CATEGORY:
+            print(f"⚠️ Ticket pool for category {category.id} stopped growing: category is nearly full")
+            self._cap(key)
+            return
+        channel = await guild.create_text_channel(
+            name=POOL_CHANNEL_NAME,
+            category=category,
+            topic=f"{POOL_TOPIC_PREFIX}{category.id}",
+            overwrites={
+                guild.default_role: discord.PermissionOverwrite(view_channel=False),
+                guild.me: discord.PermissionOverwrite(
+                    view_channel=True,
+                    send_messages=True,
+                    manage_channels=True
+                )
+            },
+            reason="Ticket channel pool"
+        )
+        self._channels[key].append(channel.id)
+
+    async def _delete(self, guild: discord.Guild, key):
+        channel = guild.get_channel(self._channels[key].pop(0))
+        if channel is not None:
+            await channel.delete(reason="Ticket channel pool: demand dropped")
+
+
+# Shared by create_ticket, /ticket set-pool and the guild events in bot.py
+channel_pool = ChannelPool()
@@ -0,0 +1,158 @@
+import copy
+import threading
+
+# Returned by OptionIndex.lookup when the guild isn't indexed (or the index
+# is stale) and the caller has to rebuild it from storage.
+MISS = object()
+
+# Stamp for lookups that skip the freshness check and trust invalidation
+# instead (in-process saves reindex, other workers' saves drop the guild),
+# so no stat() is needed. See PanelStorage.aresolve_option.
+ANY_STAMP = object()
+
+
+class OptionIndex:
+    """
+    In-memory routing index for one guild's panels:
+
+    - option_id  -> (panel_name, option)   button custom_ids (panel_option:{id})
+                                           and dropdown values
+    - panel_id   -> panel_name             dropdown custom_ids (panel_dropdown:{id})
+    - message_id -> panel_name             dropdowns with the old shared custom_id,
+                                           matched to a panel by their labels once
+                                           (remember_message; memory only)
+
+    A click therefore resolves with one dict lookup instead of loading the
+    guild's panels and scanning their options.
+
+    Each guild entry remembers the file stamp it was built from. A stamp of
+    None means "built from an in-process save" and is trusted as-is.
+    """
+
+    MAPS = ("options", "panels", "messages")
+
+    def __init__(self):
+        # guild_id -> {"stamp": ..., "options": {...}, "panels": {...}, "messages": {...}}
+        self._guilds = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(panels: dict) -> dict:
+        built = {"options": {}, "panels": {}, "messages": {}}
+        for panel_name, panel in panels.items():
+            if panel.get("id"):
+                built["panels"][panel["id"]] = panel_name
+            for opt in panel.get("options", []):
+                if opt.get("id"):
+                    built["options"][opt["id"]] = (panel_name, opt)
+        return built
+
+    @staticmethod
+    def _panel_of(value) -> str:
+        return value[0] if isinstance(value, tuple) else value
+
+    # ===============================
+    # MAINTENANCE (called by PanelStorage)
+    # ===============================
+    def set_guild(self, guild_id: int, panels: dict, stamp=None):
+        """(Re)index every panel of a guild."""
+        entry = self._build(copy.deepcopy(panels))
+        entry["stamp"] = stamp
+        with self._lock:
+            self._guilds[guild_id] = entry
+
+    def set_panel(self, guild_id: int, panel_name: str, panel: dict, stamp=None):
+        """
+        Reindex a single panel after a save. ``stamp`` is the guild file's
+        stamp before the save; if the rest of the entry is older than that,
+        the guild is dropped and fully reindexed on its next lookup.
+        """
+        built = self._build({panel_name: copy.deepcopy(panel)})
+        with self._lock:
+            entry = self._entry(guild_id, stamp)
+            if entry is None:
+                # Guild gets fully indexed on its first lookup
+                self._guilds.pop(guild_id, None)
+                return
+
+            updated = {"stamp": None}
+            for name in self.MAPS:
+                updated[name] = {
+                    key: value for key, value in entry[name].items()
+                    if self._panel_of(value) != panel_name
+                }
+                updated[name].update(built[name])
+            self._guilds[guild_id] = updated
+
+    def remove_panel(self, guild_id: int, panel_name: str, stamp=None):
+        self.set_panel(guild_id, panel_name, {}, stamp)
+
+    def remember_message(self, guild_id: int, message_id: int, panel_name: str):
+        """
+        Route ``message_id`` to ``panel_name`` until the panel or the guild
+        is reindexed (the next click then matches the labels again).
+        """
+        with self._lock:
+            entry = self._guilds.get(guild_id)
+            if entry is not None:
+                entry["messages"][message_id] = panel_name
+
+    def mark_flushed(self, guild_id: int, stamp):
+        """Record the file stamp once an indexed save has reached the disk."""
+        with self._lock:
+            entry = self._guilds.get(guild_id)
+            if entry is not None and entry["stamp"] is None:
+                entry["stamp"] = stamp
+
+    def drop_guild(self, guild_id: int):
+        with self._lock:
+            self._guilds.pop(guild_id, None)
+
+    # ===============================
+    # LOOKUP
+    # ===============================
+    def _entry(self, guild_id: int, stamp):
+        # Caller holds self._lock
+        entry = self._guilds.get(guild_id)
+        if entry is None:
+            return None
+        if stamp is not ANY_STAMP and entry["stamp"] is not None and entry["stamp"] != stamp:
+            return None
+        return entry
+
+    def lookup(self, guild_id: int, option_id: str, stamp=None):
+        """
+        Returns (panel_name, option copy), None if the option doesn't exist,
+        or MISS if the guild must be (re)indexed first.
+        """
+        with self._lock:
+            entry = self._entry(guild_id, stamp)
+            if entry is None:
+                return MISS
+            hit = entry["options"].get(option_id)
+
+        if hit is None:
+            return None
+
+        panel_name, option = hit
+        return panel_name, copy.deepcopy(option)
+
+    def lookup_panel(self, guild_id: int, panel_id: str, stamp=None):
+        """Returns the panel name, None if no panel has that id, or MISS."""
+        with self._lock:
+            entry = self._entry(guild_id, stamp)
+            if entry is None:
+                return MISS
+            return entry["panels"].get(panel_id)
+
+    def lookup_message(self, guild_id: int, message_id: int, stamp=None):
+        """Returns the name of the panel posted as that message, None, or MISS."""
+        with self._lock:
+            entry = self._entry(guild_id, stamp)
+            if entry is None:
+                return MISS
+            return entry["messages"].get(message_id)
+
+
+# Shared by every PanelStorage instance
+option_index = OptionIndex()
@@ -17,7 +17,9 @@ from tickets.modals.panel_modals import (
     RemoveTicketOptionModal
 )
 
+from tickets.panels.panel_schema import PANEL_SCHEMA_VERSION
 from tickets.panels.panel_storage import PanelStorage
+from utils.revisions import StaleWriteError
 from tickets.panels.option_selector_view import TicketOptionSelectorView
 from tickets.panels.ticket_message_editor_view import TicketMessageEditorView
 
@@ -41,6 +43,8 @@ class TicketPanelEditorView(discord.ui.View):
 
         # Panel data
         self.panel = {
+            "schema_version": PANEL_SCHEMA_VERSION,
+            "id": uuid.uuid4().hex[:8],
             "title": "Support Panel",
             "description": "Select an option below",
             "color": "",
@@ -241,7 +245,7 @@ class TicketPanelEditorView(discord.ui.View):
                 
                 from utils.embed_storage import EmbedStorage
                 storage = EmbedStorage()
-                if not storage.embed_exists(self.guild_id, embed_name_input):
+                if not await storage.aembed_exists(self.guild_id, embed_name_input):
                     await interaction.followup.send(
                         f"❌ Embed **{embed_name_input}** not found!\n"
                         f"💡 Use `/embed list` to see available embeds.",
@@ -375,7 +379,23 @@ class TicketPanelEditorView(discord.ui.View):
     # ───────────── SAVE / CLOSE ─────────────
     @discord.ui.button(label="Save", style=discord.ButtonStyle.primary, row=3)
     async def save_panel(self, interaction: discord.Interaction, _):
-        self.storage.save_panel(self.guild_id, self.panel_name, self.panel)
+        # Compare-and-swap against the revision this editor started from
+        # (0 for a brand new panel)
+        try:
+            await self.storage.asave_panel(
+                self.guild_id,
+                self.panel_name,
+                self.panel,
+                expected_revision=self.panel.get("revision", 0)
+            )
+        except StaleWriteError:
+            await interaction.response.send_message(
+                f"❌ Panel **{self.panel_name}** was changed by someone else while you were editing.\n"
+                f"💡 Re-open it with `/ticket panel edit` to get the latest version.",
+                ephemeral=True
+            )
+            return
+
         await interaction.response.send_message(
             f"✅ Panel **{self.panel_name}** saved.",
             ephemeral=True
@@ -0,0 +1,69 @@
+import hashlib
+
+# Bump this and add a step to MIGRATIONS whenever the stored panel shape changes.
+PANEL_SCHEMA_VERSION = 2
+
+
+def legacy_option_id(panel_name: str, index: int) -> str:
+    """
+    Stable ID for an option saved before options had IDs.
+    Derived from panel name + position so every load agrees on it,
+    even before the migrated panel has been written back.
+    """
+    return hashlib.sha1(f"{panel_name}:{index}".encode("utf-8")).hexdigest()[:8]
+
+
+def legacy_panel_id(panel_name: str) -> str:
+    """Stable ID for a panel saved before panels had IDs (see legacy_option_id)."""
+    return hashlib.sha1(f"panel:{panel_name}".encode("utf-8")).hexdigest()[:8]
+
+
+# ───────────── MIGRATION STEPS ─────────────
+def _v0_to_v1(panel_name: str, panel: dict):
+    """Every option gets an `id` and the `panel_name` it belongs to."""
+    for index, opt in enumerate(panel.get("options", [])):
+        if not opt.get("id"):
+            opt["id"] = legacy_option_id(panel_name, index)
+        if not opt.get("panel_name"):
+            opt["panel_name"] = panel_name
+
+
+def _v1_to_v2(panel_name: str, panel: dict):
+    """Panels get an `id`, carried in the dropdown custom_id (panel_dropdown:{id})."""
+    if not panel.get("id"):
+        panel["id"] = legacy_panel_id(panel_name)
+
+
+# from_version -> step that upgrades a panel to from_version + 1
+MIGRATIONS = {
+    0: _v0_to_v1,
+    1: _v1_to_v2,
+}
+
+
+def migrate_panel(panel_name: str, panel: dict) -> bool:
+    """
+    Upgrade a single panel dict in place to PANEL_SCHEMA_VERSION.
+    Returns True if anything changed.
+    """
+    if not isinstance(panel, dict):
+        return False
+
+    version = panel.get("schema_version", 0)
+    if version >= PANEL_SCHEMA_VERSION:
+        return False
+
+    while version < PANEL_SCHEMA_VERSION:
+        MIGRATIONS[version](panel_name, panel)
+        version += 1
+
+    panel["schema_version"] = version
+    return True
+
+
+def migrate_panels(panels: dict) -> bool:
+    """Upgrade every panel of a guild in place. Returns True if anything changed."""
+    changed = False
+    for panel_name, panel in panels.items():
+        changed |= migrate_panel(panel_name, panel)
+    return changed
@@ -1,86 +1,325 @@
+import functools
 import json
 import os
-import uuid
 
-DATA_DIR = "data/ticket_panels"
+from tickets.panels.option_index import ANY_STAMP, MISS, option_index
+from tickets.panels.panel_schema import PANEL_SCHEMA_VERSION, migrate_panel, migrate_panels
+from utils.async_io import run_io
+from utils.config_snapshot import config_snapshot
+from utils.data_layout import DATA_DIR, guild_file, iter_guild_files, preload
+from utils.invalidation import bus
+from utils.json_cache import JsonFileCache, file_stamp
+from utils.json_writer import atomic_write_json, write_behind
+from utils.revisions import KeyedLocks, StaleWriteError, next_revision
+from utils.sqlite_storage import get_sqlite_storage
+
+# Shared by every PanelStorage() instance in the process. Views, cogs and
+# callbacks all construct their own PanelStorage, so the cache must live at
+# module level to be useful.
+PANEL_CACHE_MAX_BYTES = int(os.getenv("PANEL_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+# Panels from files that predate the current schema are upgraded in memory
+# (deterministically) when parsed; migrate_all() persists the upgrade.
+_cache = JsonFileCache(
+    PANEL_CACHE_MAX_BYTES,
+    transform=migrate_panels,
+    source=config_snapshot
+)
+
+# Serializes read-modify-write of one guild's file without blocking others
+_guild_locks = KeyedLocks()
+
+UPDATE_RETRIES = 5
+
+# Schema version every stored panel is at, written after a full
+# migrate_all() pass so later starts skip the walk. SQLite keeps it in
+# PRAGMA user_version instead.
+SCHEMA_MARKER_PATH = os.path.join(DATA_DIR, "panel_schema.json")
 
 
 class PanelStorage:
     def __init__(self):
-        os.makedirs(DATA_DIR, exist_ok=True)
+        # SqliteStorage when STORAGE_BACKEND=sqlite, else JSON files
+        self.db = get_sqlite_storage()
 
     def _file(self, guild_id: int) -> str:
-        return os.path.join(DATA_DIR, f"{guild_id}.json")
+        # data/ticket_panels/{xx}/{guild_id}.json (see utils.data_layout)
+        return guild_file("panels", guild_id)
 
     # ===============================
     # LOAD ALL PANELS
     # ===============================
     def load_panels(self, guild_id: int) -> dict:
+        if self.db:
+            panels = self.db.load_all("panels", guild_id)
+            migrate_panels(panels)
+            return panels
+
         path = self._file(guild_id)
-        if not os.path.exists(path):
-            return {}
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+        # A save may still be queued in the write-behind buffer
+        pending = write_behind.pending(path)
+        if pending is not None:
+            return pending
+
+        # Served from memory unless the file changed on disk since last read
+        return _cache.load(path)
 
     # ===============================
     # SAVE ALL PANELS
     # ===============================
     def save_panels(self, guild_id: int, panels: dict):
-        with open(self._file(guild_id), "w", encoding="utf-8") as f:
-            json.dump(panels, f, indent=4, ensure_ascii=False)
+        # Saved panels are always stamped with the current schema version
+        migrate_panels(panels)
+
+        with _guild_locks.hold(guild_id):
+            # Routing index is maintained at save time (before a zero-delay
+            # write can report the new file stamp back to it)
+            option_index.set_guild(guild_id, panels)
+
+            if self.db:
+                self.db.replace_all("panels", guild_id, panels)
+                bus.publish("panels", guild_id)
+                return
+
+            self._schedule_write(guild_id, panels)
+
+    def _schedule_write(self, guild_id: int, panels: dict):
+        # Atomic temp-file + rename, coalesced with other saves to this
+        # guild; the cache is refreshed once the file has been written
+        write_behind.schedule(
+            self._file(guild_id),
+            panels,
+            indent=4,
+            on_flush=functools.partial(self._on_flushed, guild_id)
+        )
+
+    @staticmethod
+    def _on_flushed(guild_id: int, path: str, panels: dict):
+        config_snapshot.invalidate(path)
+        _cache.store(path, panels)
+        if not write_behind.is_queued(path):
+            option_index.mark_flushed(guild_id, file_stamp(path))
+        # Other worker processes drop their copy (see utils.invalidation)
+        bus.publish("panels", guild_id)
+
+    # ===============================
+    # CACHE
+    # ===============================
+    def evict_guild(self, guild_id: int):
+        """Drop a guild's panels from the in-memory cache and routing index."""
+        config_snapshot.invalidate(self._file(guild_id))
+        _cache.evict(self._file(guild_id))
+        option_index.drop_guild(guild_id)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return _cache.stats()
+
+    def preload_guild(self, guild_id: int):
+        """Warm the cache and routing index for one guild."""
+        stamp = self._index_stamp(guild_id)
+        option_index.set_guild(guild_id, self.load_panels(guild_id), stamp)
+
+    def preload(self, guild_filter=None) -> dict:
+        """Warm the cache and routing index for every stored guild in parallel."""
+        guild_ids = self.db.guild_ids("panels") if self.db else None
+        return preload("panels", self.preload_guild, guild_ids, guild_filter)
 
     # ===============================
     # SAVE SINGLE PANEL
     # ===============================
-    def save_panel(self, guild_id: int, panel_name: str, panel_data: dict):
-        panels = self.load_panels(guild_id)
-        panels[panel_name] = panel_data
-        self.save_panels(guild_id, panels)
+    def save_panel(self, guild_id: int, panel_name: str, panel_data: dict,
+                   expected_revision=None) -> int:
+        """
+        Save one panel and bump its revision counter.
 
+        With ``expected_revision`` the save only succeeds if the stored
+        panel is still at that revision (0 = must not exist yet); otherwise
+        StaleWriteError is raised. ``panel_data["revision"]`` is updated in
+        place and the new revision is returned.
+        """
+        if self.db:
+            migrate_panel(panel_name, panel_data)
+            revision = self.db.compare_and_set(
+                "panels", guild_id, panel_name, panel_data, expected_revision
+            )
+            panel_data["revision"] = revision
+            option_index.set_panel(guild_id, panel_name, panel_data)
+            bus.publish("panels", guild_id)
+            return revision
+
+        with _guild_locks.hold(guild_id):
+            panels = self.load_panels(guild_id)
+            revision = next_revision(panel_name, panels.get(panel_name), expected_revision)
+            migrate_panels(panels)
+            migrate_panel(panel_name, panel_data)
+            panel_data["revision"] = revision
+            panels[panel_name] = panel_data
+
+            # Only this panel's routing entries change
+            option_index.set_panel(guild_id, panel_name, panel_data, self._index_stamp(guild_id))
+            self._schedule_write(guild_id, panels)
+        return revision
+
+    def update_panel(self, guild_id: int, panel_name: str, mutate, retries: int = UPDATE_RETRIES):
+        """
+        Read-modify-write with automatic retry: ``mutate(panel)`` is applied
+        to the latest stored panel and saved with compare-and-swap; if
+        another writer got in first, the read and mutation are redone.
+        Returns the saved panel, or None if it doesn't exist.
+        """
+        for attempt in range(retries):
+            panel = self.get_panel(guild_id, panel_name)
+            if not panel:
+                return None
+
+            mutate(panel)
+            try:
+                self.save_panel(guild_id, panel_name, panel, panel.get("revision", 0))
+                return panel
+            except StaleWriteError:
+                if attempt == retries - 1:
+                    raise
+
+    # ===============================
+    # DELETE SINGLE PANEL
     # ===============================
-    # ENSURE PANEL INTEGRITY
+    def delete_panel(self, guild_id: int, panel_name: str) -> bool:
+        if self.db:
+            option_index.remove_panel(guild_id, panel_name)
+            deleted = self.db.delete("panels", guild_id, panel_name)
+            bus.publish("panels", guild_id)
+            return deleted
+
+        with _guild_locks.hold(guild_id):
+            panels = self.load_panels(guild_id)
+            if panel_name not in panels:
+                return False
+
+            panels.pop(panel_name)
+            migrate_panels(panels)
+            option_index.remove_panel(guild_id, panel_name, self._index_stamp(guild_id))
+            self._schedule_write(guild_id, panels)
+        return True
+
     # ===============================
-    def _ensure_panel_integrity(self, guild_id: int, panel_name: str, panel: dict) -> dict:
+    # SCHEMA MIGRATION
+    # ===============================
+    def migrate_guild(self, guild_id: int) -> bool:
         """
-        Ensure panel options have required fields (id, panel_name).
-        Fixes old panels that might be missing these fields and saves changes.
+        Persist the current schema for one guild's panels.
+        Returns True if the stored data had to be upgraded.
         """
-        if not panel or "options" not in panel:
-            return panel
-        
-        options = panel.get("options", [])
-        needs_save = False
-        
-        for opt in options:
-            # Add missing ID (only if it doesn't exist)
-            if not opt.get("id"):
-                opt["id"] = uuid.uuid4().hex[:8]
-                needs_save = True
-            
-            # Add missing panel_name
-            if not opt.get("panel_name"):
-                opt["panel_name"] = panel_name
-                needs_save = True
-        
-        # Save back to storage if changes were made
-        if needs_save:
-            self.save_panel(guild_id, panel_name, panel)
-        
-        return panel
+        with _guild_locks.hold(guild_id):
+            if self.db:
+                panels = self.db.load_all("panels", guild_id)
+            else:
+                path = self._file(guild_id)
+                panels = write_behind.pending(path)
+                if panels is None:
+                    # Raw file content: the cache would hand back the upgraded copy
+                    panels = config_snapshot.load(path)
+
+            if not migrate_panels(panels):
+                return False
+
+            self.save_panels(guild_id, panels)
+        return True
+
+    def migrate_all(self, force: bool = False) -> int:
+        """
+        One-shot migration pass over every stored guild.
+        Run at startup (or on demand); returns the number of guilds upgraded.
+
+        Skipped once the schema marker says the stored panels are already
+        at PANEL_SCHEMA_VERSION. Pass force=True after copying old panel
+        files into the data directory by hand (reads upgrade them in
+        memory either way).
+        """
+        if not force and self._schema_marker() >= PANEL_SCHEMA_VERSION:
+            return 0
+
+        if self.db:
+            guild_ids = self.db.guild_ids("panels")
+        else:
+            guild_ids = [guild_id for guild_id, _ in iter_guild_files("panels")]
+
+        migrated = sum(1 for guild_id in guild_ids if self.migrate_guild(guild_id))
+
+        # The upgraded panels must be on disk before the marker vouches for them
+        write_behind.flush()
+        self._set_schema_marker(PANEL_SCHEMA_VERSION)
+        return migrated
+
+    def _schema_marker(self) -> int:
+        if self.db:
+            return self.db.user_version()
+        try:
+            with open(SCHEMA_MARKER_PATH, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("version", 0))
+        except (OSError, ValueError, AttributeError):
+            return 0
+
+    def _set_schema_marker(self, version: int):
+        if self.db:
+            self.db.set_user_version(version)
+        else:
+            atomic_write_json(SCHEMA_MARKER_PATH, {"version": version})
 
     # ===============================
     # GET SINGLE PANEL
     # ===============================
     def get_panel(self, guild_id: int, panel_name: str):
-        panel = self.load_panels(guild_id).get(panel_name)
-        if panel:
-            # Ensure all options have required fields (and save if changed)
-            panel = self._ensure_panel_integrity(guild_id, panel_name, panel)
-        return panel
+        """Pure read: never writes, even for panels saved under an old schema."""
+        if self.db:
+            panel = self.db.get("panels", guild_id, panel_name)
+            if panel:
+                migrate_panel(panel_name, panel)
+            return panel
+
+        return self.load_panels(guild_id).get(panel_name)
+
+    # ===============================
+    # OPTION ROUTING (custom_id -> option)
+    # ===============================
+    def _index_stamp(self, guild_id: int):
+        if self.db:
+            return None
+        path = self._file(guild_id)
+        # While a save is queued the index (built from that save) is authoritative
+        return None if write_behind.is_dirty(path) else file_stamp(path)
+
+    def _resolve(self, lookup, guild_id: int, key: str):
+        stamp = self._index_stamp(guild_id)
+        hit = lookup(guild_id, key, stamp)
+        if hit is MISS:
+            option_index.set_guild(guild_id, self.load_panels(guild_id), stamp)
+            hit = lookup(guild_id, key, stamp)
+        return None if hit is MISS else hit
+
+    def resolve_option(self, guild_id: int, option_id: str):
+        """
+        Resolve an option id (button custom_id suffix / dropdown value)
+        to (panel_name, option), or None if no such option exists.
+        Only touches storage when the guild isn't indexed yet or its file
+        changed on disk.
+        """
+        return self._resolve(option_index.lookup, guild_id, option_id)
+
+    def resolve_panel(self, guild_id: int, panel_id: str):
+        """Panel name for a panel id (dropdown custom_id suffix), or None."""
+        return self._resolve(option_index.lookup_panel, guild_id, panel_id)
+
+    def resolve_message(self, guild_id: int, message_id: int):
+        """Name of the panel posted as ``message_id``, or None."""
+        return self._resolve(option_index.lookup_message, guild_id, message_id)
+
+    def remember_message(self, guild_id: int, message_id: int, panel_name: str):
+        """
+        Remember in the routing index (memory only: no write, no new
+        revision) that ``message_id`` shows ``panel_name``.
+        """
+        option_index.remember_message(guild_id, message_id, panel_name)
 
     # ===============================
     # GET ALL PANELS (NEW)
@@ -91,3 +330,53 @@ class PanelStorage:
         Used for autocomplete, config viewing, etc.
         """
         return self.load_panels(guild_id)
+
+    # ===============================
+    # ASYNC API (storage thread pool)
+    # ===============================
+    async def aload_panels(self, guild_id: int) -> dict:
+        return await run_io(self.load_panels, guild_id)
+
+    async def asave_panels(self, guild_id: int, panels: dict):
+        await run_io(self.save_panels, guild_id, panels)
+
+    async def asave_panel(self, guild_id: int, panel_name: str, panel_data: dict,
+                          expected_revision=None) -> int:
+        return await run_io(self.save_panel, guild_id, panel_name, panel_data, expected_revision)
+
+    async def aupdate_panel(self, guild_id: int, panel_name: str, mutate):
+        return await run_io(self.update_panel, guild_id, panel_name, mutate)
+
+    async def adelete_panel(self, guild_id: int, panel_name: str) -> bool:
+        return await run_io(self.delete_panel, guild_id, panel_name)
+
+    async def aget_panel(self, guild_id: int, panel_name: str):
+        return await run_io(self.get_panel, guild_id, panel_name)
+
+    async def aget_all_panels(self, guild_id: int) -> dict:
+        return await run_io(self.get_all_panels, guild_id)
+
+    async def aresolve_option(self, guild_id: int, option_id: str):
+        # Indexed guilds resolve inline, without a stat() on the event loop:
+        # saves keep the index current (other workers' via the bus). Only a
+        # cold guild hits the pool, where resolve_option checks the file.
+        hit = option_index.lookup(guild_id, option_id, ANY_STAMP)
+        if hit is not MISS:
+            return hit
+        return await run_io(self.resolve_option, guild_id, option_id)
+
+    async def aresolve_panel(self, guild_id: int, panel_id: str):
+        hit = option_index.lookup_panel(guild_id, panel_id, ANY_STAMP)
+        if hit is not MISS:
+            return hit
+        return await run_io(self.resolve_panel, guild_id, panel_id)
+
+    async def aresolve_message(self, guild_id: int, message_id: int):
+        hit = option_index.lookup_message(guild_id, message_id, ANY_STAMP)
+        if hit is not MISS:
+            return hit
+        return await run_io(self.resolve_message, guild_id, message_id)
+
+
+# Another worker process saved this guild's panels
+bus.subscribe("panels", lambda guild_id: PanelStorage().evict_guild(guild_id))
@@ -0,0 +1,150 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Ticket channel topic: "panel:{name};owner:{id};option:{id}". Tickets
+# opened before option ids existed have no "option:" part.
+TOPIC_RE = re.compile(r"panel:(?P<panel>[^;]*)(?:;owner:(?P<owner>\d+))?(?:;option:(?P<option>[\w-]+))?")
+
+# Closed tickets are renamed to "closed-{owner}" and kept for history
+CLOSED_PREFIX = "closed-"
+
+
+def ticket_topic(panel_name: str, owner_id: int, option_id: str | None = None) -> str:
+    topic = f"panel:{panel_name};owner:{owner_id}"
+    if option_id:
+        topic += f";option:{option_id}"
+    return topic
+
+
+def parse_topic(topic: str | None) -> dict | None:
+    """{"panel", "owner", "option"} from a ticket topic, None for other channels."""
+    if not topic:
+        return None
+    m = TOPIC_RE.search(topic)
+    if not m:
+        return None
+    return {
+        "panel": m.group("panel").strip(),
+        "owner": int(m.group("owner")) if m.group("owner") else None,
+        "option": m.group("option")
+    }
+
+
+@dataclass
+class OpenTicket:
+    channel_id: int
+    owner_id: int
+    panel_name: str
+    option_id: str | None
+    category_id: int | None
+    name: str
+
+
+class OpenTicketIndex:
+    """
+    Open tickets per guild, keyed by owner, so the per-option limit check
+    in create_ticket doesn't walk every channel.
+
+    A guild is indexed from its cached channel topics the first time it's
+    needed (no REST calls), then kept current by create/close and the
+    channel update/delete listeners in bot.py.
+    """
+
+    def __init__(self):
+        # guild_id -> channel_id -> OpenTicket
+        self._channels = {}
+        # guild_id -> owner_id -> {channel_id, ...}
+        self._owners = {}
+
+    # ===============================
+    # BUILD
+    # ===============================
+    def _index(self, guild) -> dict:
+        owners = self._owners.get(guild.id)
+        if owners is None:
+            self._channels[guild.id] = {}
+            owners = self._owners[guild.id] = defaultdict(set)
+            for channel in guild.text_channels:
+                ticket = self._from_channel(channel)
+                if ticket is not None:
+                    self._store(guild.id, ticket)
+        return owners
+
+    def _store(self, guild_id: int, ticket: OpenTicket):
+        self._channels[guild_id][ticket.channel_id] = ticket
+        self._owners[guild_id][ticket.owner_id].add(ticket.channel_id)
+
+    @staticmethod
+    def _from_channel(channel, topic: str | None = None) -> OpenTicket | None:
+        meta = parse_topic(topic or channel.topic)
+        if meta is None or meta["owner"] is None or channel.name.startswith(CLOSED_PREFIX):
+            return None
+        return OpenTicket(
+            channel_id=channel.id,
+            owner_id=meta["owner"],
+            panel_name=meta["panel"],
+            option_id=meta["option"],
+            category_id=channel.category_id,
+            name=channel.name
+        )
+
+    # ===============================
+    # QUERY
+    # ===============================
+    def count(self, guild, owner_id: int, option_id: str | None, category_id: int | None, prefix: str) -> int:
+        """
+        Open tickets ``owner_id`` has for an option. Tickets from before
+        option ids were stored in the topic are matched the old way, by
+        category and channel name prefix.
+        """
+        owned = self._index(guild).get(owner_id, ())
+        channels = self._channels[guild.id]
+
+        count = 0
+        for channel_id in owned:
+            ticket = channels[channel_id]
+            if ticket.option_id is not None:
+                count += ticket.option_id == option_id
+            else:
+                count += ticket.category_id == category_id and ticket.name.startswith(prefix)
+        return count
+
+    # ===============================
+    # UPDATES
+    # ===============================
+    def add(self, channel, topic: str | None = None):
+        """
+        A ticket channel was created or edited. ``topic`` overrides
+        ``channel.topic`` when the cached channel isn't updated yet.
+        """
+        guild_id = channel.guild.id
+        ticket = self._from_channel(channel, topic)
+        if ticket is None and guild_id not in self._owners:
+            return  # Nothing indexed that could be stale
+
+        # Index the guild now: a channel we just created may not be in
+        # the gateway cache yet when the next limit check builds it
+        self._index(channel.guild)
+        self.remove(guild_id, channel.id)
+        if ticket is not None:
+            self._store(guild_id, ticket)
+
+    def remove(self, guild_id: int, channel_id: int):
+        """A ticket was closed or its channel deleted."""
+        channels = self._channels.get(guild_id)
+        ticket = channels.pop(channel_id, None) if channels is not None else None
+        if ticket is None:
+            return
+        owned = self._owners[guild_id][ticket.owner_id]
+        owned.discard(channel_id)
+        if not owned:
+            del self._owners[guild_id][ticket.owner_id]
+
+    def drop_guild(self, guild_id: int):
+        self._channels.pop(guild_id, None)
+        self._owners.pop(guild_id, None)
+
+
+# Shared by the ticket flow and the channel listeners in bot.py
+ticket_index = OpenTicketIndex()
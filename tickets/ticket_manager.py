@@ -1,14 +1,20 @@
+import asyncio
 import discord
 import re
 from datetime import datetime
 from io import BytesIO
 from discord import utils as discord_utils
 
+from tickets.channel_pool import channel_pool
 from tickets.constants import DEFAULT_TICKET_TEMPLATE
 from tickets.utils.ticket_embed_builder import build_ticket_embed
-from tickets.utils.transcript_generator import TranscriptGenerator
 from tickets.panels.panel_storage import PanelStorage
+from tickets.ticket_index import CLOSED_PREFIX, parse_topic, ticket_index, ticket_topic
+from utils.api_calls import count_api_calls
+from utils.cache_profile import resolve_member
 from utils.embed_storage import EmbedStorage
+from utils.inflight import SingleFlight
+from utils.settings_storage import SettingsStorage
 
 
 class TicketCloseView(discord.ui.View):
@@ -34,33 +40,21 @@ class TicketCloseView(discord.ui.View):
         channel = interaction.channel
         
         # Resolve ticket owner
-        ticket_owner_id = self.ticket_owner_id
-        if channel.topic:
-            m = re.search(r"owner:(\d+)", channel.topic)
-            if m:
-                try:
-                    ticket_owner_id = int(m.group(1))
-                except ValueError:
-                    pass
+        topic = parse_topic(channel.topic) or {}
+        ticket_owner_id = topic.get("owner") or self.ticket_owner_id
 
         # Check permissions: owner or support staff or admin
         is_owner = interaction.user.id == ticket_owner_id
         is_admin = interaction.user.guild_permissions.administrator
         
-        is_support_staff = False
-        import json
-        import os
-        settings_file = os.path.join("data/settings", f"{interaction.guild.id}.json")
-        
-        if os.path.exists(settings_file):
-            with open(settings_file, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-                support_team_role_id = settings.get("support_team_role_id")
-                
-                if support_team_role_id:
-                    support_role = interaction.guild.get_role(support_team_role_id)
-                    if support_role and support_role in interaction.user.roles:
-                        is_support_staff = True
+        # Cached settings + member role lookup: no disk read per close
+        settings = await SettingsStorage().aget_guild_settings(interaction.guild.id)
+        support_team_role_id = settings.support_team_role_id
+
+        is_support_staff = bool(
+            support_team_role_id
+            and interaction.user.get_role(support_team_role_id)
+        )
 
         if not (is_owner or is_support_staff or is_admin):
             await interaction.followup.send(
@@ -69,21 +63,24 @@ class TicketCloseView(discord.ui.View):
             )
             return
 
-        ticket_owner = await interaction.client.fetch_user(ticket_owner_id)
+        # The owner closing their own ticket is already in the payload;
+        # otherwise cache, then REST (the member cache may be off under
+        # CACHE_PROFILE=ticket). A user who left is still fetched for the name.
+        if is_owner:
+            ticket_owner = interaction.user
+        else:
+            ticket_owner = await resolve_member(interaction.guild, ticket_owner_id)
+            if ticket_owner is None:
+                ticket_owner = await interaction.client.fetch_user(ticket_owner_id)
 
         # ───────────── RESOLVE PANEL NAME (SOURCE OF TRUTH) ─────────────
-        panel_name = self.panel_name
-        if channel.topic:
-            # Extract panel name from topic format: "panel:{name};owner:{id}"
-            if "panel:" in channel.topic:
-                panel_part = channel.topic.split("panel:")[1].split(";")[0].strip()
-                if panel_part:
-                    panel_name = panel_part
+        # Topic format: "panel:{name};owner:{id};option:{id}"
+        panel_name = topic.get("panel") or self.panel_name
 
         # ───────────── LOAD PANEL CONFIG ─────────────
         # Use interaction.guild.id instead of self.guild_id (which may be 0 after restart)
         storage = PanelStorage()
-        panel = storage.get_panel(interaction.guild.id, panel_name)
+        panel = await storage.aget_panel(interaction.guild.id, panel_name)
         transcript_channel_id = panel.get("transcript_channel_id") if panel else None
 
         if not transcript_channel_id:
@@ -108,6 +105,9 @@ class TicketCloseView(discord.ui.View):
 
             print(f"DEBUG: Generating transcript for {channel.name} (panel={panel_name})")
 
+            # Imported on first close: the renderer is large and only used here
+            from tickets.utils.transcript_generator import TranscriptGenerator
+
             html_bytes, users_in_transcript = await TranscriptGenerator.generate_transcript(
                 channel=channel,
                 ticket_owner=ticket_owner,
@@ -193,15 +193,10 @@ class TicketCloseView(discord.ui.View):
                 filename=f"transcript-{channel.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.html"
             )
 
-            await transcript_channel.send(embed=transcript_embed, file=file)
-
             # ───────────── CLOSE CHANNEL ─────────────
-            # Rename the channel
-            new_name = f"closed-{ticket_owner.name}".lower()
-            await channel.edit(name=new_name)
-            
-            # Lock the channel - only allow staff to view and send messages
-            # Disable sending for regular users, keep viewing for history
+            # Rename and lock in one edit - only allow staff to view and
+            # send messages; the owner keeps read access for history
+            new_name = f"{CLOSED_PREFIX}{ticket_owner.name}".lower()
             overwrites = {
                 interaction.guild.default_role: discord.PermissionOverwrite(
                     view_channel=False
@@ -217,12 +212,24 @@ class TicketCloseView(discord.ui.View):
                     manage_channels=True
                 )
             }
-            await channel.edit(overwrites=overwrites)
+
+            # The transcript is already rendered, so the upload and the
+            # lock are independent: run both, then report each outcome
+            upload_result, lock_result = await asyncio.gather(
+                transcript_channel.send(embed=transcript_embed, file=file),
+                channel.edit(name=new_name, overwrites=overwrites),
+                return_exceptions=True
+            )
+            if not isinstance(lock_result, BaseException):
+                ticket_index.remove(interaction.guild.id, channel.id)
 
             await interaction.followup.send(
-                f"Ticket closed successfully!\n"
-                f"Transcript sent to {transcript_channel.mention}\n"
-                f"Channel locked and renamed to `{new_name}`",
+                close_report(
+                    uploaded=upload_result,
+                    locked=lock_result,
+                    transcript_channel=transcript_channel,
+                    new_name=new_name
+                ),
                 ephemeral=True
             )
 
@@ -241,6 +248,100 @@ class TicketCloseView(discord.ui.View):
             )
 
 
+def _step_error(result) -> str | None:
+    """Why a close step failed (None if it succeeded)."""
+    if not isinstance(result, BaseException):
+        return None
+    if isinstance(result, discord.Forbidden):
+        return "missing permissions"
+    if isinstance(result, discord.HTTPException):
+        return f"Discord error {result.status}: {result.text or 'no details'}"
+    return f"{type(result).__name__}: {result}"
+
+
+def close_report(uploaded, locked, transcript_channel, new_name: str) -> str:
+    """
+    Message for the closer, given the results of the upload and the lock
+    (a return value, or the exception raised).
+    """
+    upload_error = _step_error(uploaded)
+    lock_error = _step_error(locked)
+    for step, error in (("transcript upload", upload_error), ("lock/rename", lock_error)):
+        if error:
+            print(f"ERROR closing ticket ({step}): {error}")
+
+    if not upload_error and not lock_error:
+        return (
+            f"Ticket closed successfully!\n"
+            f"Transcript sent to {transcript_channel.mention}\n"
+            f"Channel locked and renamed to `{new_name}`"
+        )
+
+    if upload_error and lock_error:
+        lines = ["❌ Ticket could not be closed:"]
+    else:
+        lines = ["⚠️ Ticket only partly closed:"]
+    if upload_error:
+        lines.append(f"• Transcript **not** sent to {transcript_channel.mention} ({upload_error})")
+    else:
+        lines.append(f"• Transcript sent to {transcript_channel.mention}")
+    if lock_error:
+        lines.append(f"• Channel **not** locked or renamed ({lock_error})")
+    else:
+        lines.append(f"• Channel locked and renamed to `{new_name}`")
+    return "\n".join(lines)
+
+
+# ───────────── PERMISSION TEMPLATES ─────────────
+OWNER_OVERWRITE = discord.PermissionOverwrite(
+    view_channel=True,
+    send_messages=True,
+    read_message_history=True
+)
+
+# guild_id -> (support role id or None, overwrites shared by every ticket
+# of the guild). Only the owner's entry is added per ticket.
+_base_overwrites = {}
+
+
+def base_overwrites(guild: discord.Guild, support_team_role_id: int | None) -> dict:
+    support_role = guild.get_role(support_team_role_id) if support_team_role_id else None
+    key = support_role.id if support_role else None
+
+    cached = _base_overwrites.get(guild.id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        guild.me: discord.PermissionOverwrite(
+            view_channel=True,
+            send_messages=True,
+            manage_channels=True
+        )
+    }
+    if support_role:
+        overwrites[support_role] = discord.PermissionOverwrite(
+            view_channel=True,
+            send_messages=True,
+            read_message_history=True,
+            manage_messages=True,
+            manage_channels=True
+        )
+
+    _base_overwrites[guild.id] = (key, overwrites)
+    return overwrites
+
+
+def forget_guild(guild_id: int):
+    _base_overwrites.pop(guild_id, None)
+
+
+# ───────────── IN-FLIGHT TICKET REQUESTS ─────────────
+# Keyed by (guild_id, user_id, option id); finished calls drop their key
+_ticket_flights = SingleFlight()
+
+
 class TicketManager:
 
     @staticmethod
@@ -286,6 +387,28 @@ class TicketManager:
             raise ValueError("panel_name missing from ticket option")
 
         # ───────────────── TICKET OPTION ─────────────────
+        # A double-click or two quick dropdown picks arrive as concurrent
+        # calls for the same (guild, user, option): they share one channel
+        key = (interaction.guild.id, interaction.user.id, option.get("id") or option["panel_name"])
+        (channel, refusal), shared = await _ticket_flights.run(
+            key, TicketManager._open_ticket, interaction, option
+        )
+        if shared:
+            print(f"🔁 Coalesced duplicate ticket request {key}")
+
+        # ───────────── CONFIRM USER ─────────────
+        content = refusal or f"Ticket created: {channel.mention}"
+        if interaction.response.is_done():
+            await interaction.followup.send(content, ephemeral=True)
+        else:
+            await interaction.response.send_message(content, ephemeral=True)
+
+    @staticmethod
+    async def _open_ticket(interaction: discord.Interaction, option: dict):
+        """
+        Limit check + channel creation for one ticket option. Returns
+        ``(channel, None)``, or ``(None, reason)`` when the limit is reached.
+        """
         guild = interaction.guild
         user = interaction.user
 
@@ -307,74 +430,36 @@ class TicketManager:
             category = interaction.channel.category
 
         # ───────────── LIMIT CHECK ─────────────
+        # Open tickets are indexed by owner from the channel topics, so
+        # this neither scans the guild nor needs a member cache
         limit = option.get("limit")  # None = unlimited
         if limit is not None:
-            existing = [
-                c for c in guild.text_channels
-                if c.category == category
-                and c.name.startswith(prefix)
-                and user in c.members
-            ]
-
-            if len(existing) >= limit:
-                if not interaction.response.is_done():
-                    await interaction.response.send_message(
-                        f"You can only have **{limit}** open ticket(s) for **{option['label']}**.",
-                        ephemeral=True
-                    )
-                return
+            existing = ticket_index.count(
+                guild,
+                user.id,
+                option.get("id"),
+                category.id if category else None,
+                prefix
+            )
+
+            if existing >= limit:
+                return None, f"You can only have **{limit}** open ticket(s) for **{option['label']}**."
 
         # ───────────── PERMISSIONS ─────────────
+        # Default role, bot and support team (from the cached guild
+        # settings) are prebuilt per guild; only the owner is added here
+        settings = await SettingsStorage().aget_guild_settings(guild.id)
         overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            user: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True,
-                read_message_history=True
-            ),
-            guild.me: discord.PermissionOverwrite(
-                view_channel=True,
-                send_messages=True,
-                manage_channels=True
-            )
+            **base_overwrites(guild, settings.support_team_role_id),
+            user: OWNER_OVERWRITE
         }
 
-        # ───────────── ADD SUPPORT TEAM ACCESS ─────────────
-        # Load support team role from settings
-        import json
-        import os
-        settings_file = os.path.join("data/settings", f"{guild.id}.json")
-        
-        if os.path.exists(settings_file):
-            with open(settings_file, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-                support_team_role_id = settings.get("support_team_role_id")
-                
-                if support_team_role_id:
-                    support_role = guild.get_role(support_team_role_id)
-                    if support_role:
-                        overwrites[support_role] = discord.PermissionOverwrite(
-                            view_channel=True,
-                            send_messages=True,
-                            read_message_history=True,
-                            manage_messages=True,
-                            manage_channels=True
-                        )
-
-        # ───────────── CREATE CHANNEL ─────────────
-        channel = await guild.create_text_channel(
-            name=channel_name,
-            category=category,
-            overwrites=overwrites,
-            reason=f"Ticket opened by {user}"
-        )
-
         # 🔐 STORE PANEL NAME + OWNER (CRITICAL)
         # Store both panel name and ticket owner id so persistent views
         # can resolve the correct ticket owner after restarts.
-        await channel.edit(topic=f"panel:{option['panel_name']};owner:{user.id}")
+        topic = ticket_topic(option["panel_name"], user.id, option.get("id"))
 
-        # ───────────── INTRO EMBED ─────────────
+        # ───────────── INTRO EMBED + CLOSE BUTTON ─────────────
         template = option.get("ticket_message") or DEFAULT_TICKET_TEMPLATE
 
         embed = build_ticket_embed(
@@ -383,28 +468,39 @@ class TicketManager:
             option=option
         )
 
-        await channel.send(embed=embed)
-
-        # ───────────── CLOSE BUTTON ─────────────
         close_view = TicketCloseView(
             ticket_owner_id=user.id,
             panel_name=option["panel_name"],
             guild_id=guild.id
         )
 
-        await channel.send(
-            "Click the button below to close this ticket and generate a transcript:",
-            view=close_view
-        )
-
-        # ───────────── CONFIRM USER ─────────────
-        if interaction.response.is_done():
-            await interaction.followup.send(
-                f"Ticket created: {channel.mention}",
-                ephemeral=True
+        # Two REST calls per ticket: create the channel (topic included)
+        # or claim a pre-created one from the pool (TICKET_POOL=1), then
+        # one message with the intro embed and the close button
+        with count_api_calls("ticket_open"):
+            channel = await channel_pool.claim(
+                guild,
+                category,
+                option,
+                name=channel_name,
+                topic=topic,
+                overwrites=overwrites,
+                reason=f"Ticket opened by {user}"
             )
-        else:
-            await interaction.response.send_message(
-                f"Ticket created: {channel.mention}",
-                ephemeral=True
+            if channel is None:
+                channel = await guild.create_text_channel(
+                    name=channel_name,
+                    category=category,
+                    topic=topic,
+                    overwrites=overwrites,
+                    reason=f"Ticket opened by {user}"
+                )
+            ticket_index.add(channel)
+
+            await channel.send(
+                "Click the button below to close this ticket and generate a transcript:",
+                embed=embed,
+                view=close_view
             )
+
+        return channel, None
@@ -8,72 +8,61 @@ from utils.embed_storage import EmbedStorage
 
 class TicketButtonView(discord.ui.View):
     """
-    Persistent view for ticket panel buttons.
+    View used to post a button panel.
     Supports BOTH:
     - ticket options (create ticket)
     - embed options (send embed ephemerally)
+
+    Clicks don't depend on this view being registered: TicketButton is a
+    DynamicItem added once at startup (bot.add_dynamic_items), so every
+    posted panel keeps working across restarts without per-panel setup.
     """
 
-    def __init__(self, guild_id: int, panel_name: str):
+    def __init__(self, panel: dict):
         super().__init__(timeout=None)
-        
-        self.guild_id = guild_id
-        self.panel_name = panel_name
-        self.storage = PanelStorage()
-        
-        # ✅ FIX: Load panel to get options
-        panel = self.storage.get_panel(guild_id, panel_name)
-        if not panel:
-            return
-        
-        options = panel.get("options", [])
-        if not options:
-            return
-
-        for option in options:
-            self.add_item(TicketButton(option, guild_id, panel_name))
 
+        for option in panel.get("options", []):
+            self.add_item(TicketButton(option["id"], option))
 
-class TicketButton(discord.ui.Button):
-    def __init__(self, option: dict, guild_id: int, panel_name: str):
-        self.option_id = option.get("id")
-        self.guild_id = guild_id
-        self.panel_name = panel_name
 
-        emoji = parse_emoji(option.get("emoji"))
+class TicketButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"panel_option:(?P<option_id>[\w-]+)"
+):
+    def __init__(self, option_id: str, option: dict | None = None):
+        # ``option`` is only needed to render the button; clicks rebuild
+        # the item from its custom_id alone
+        option = option or {}
+        self.option_id = option_id
 
         super().__init__(
-            label=option.get("label", "Option"),
-            style=discord.ButtonStyle.primary,
-            emoji=emoji,
-            custom_id=f"panel_option:{option['id']}"  # ✅ STABLE ID
+            discord.ui.Button(
+                label=option.get("label", "Option"),
+                style=discord.ButtonStyle.primary,
+                emoji=parse_emoji(option.get("emoji")),
+                custom_id=f"panel_option:{option_id}"  # ✅ STABLE ID
+            )
         )
 
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["option_id"])
+
     async def callback(self, interaction: discord.Interaction):
-        # Load fresh option from storage (handles panel edits and restarts)
+        # Resolve the option through the routing index (kept current on
+        # every save, so panel edits and restarts are handled)
         storage = PanelStorage()
-        panel = storage.get_panel(self.guild_id, self.panel_name)
+        resolved = await storage.aresolve_option(interaction.guild_id, self.option_id)
         
-        if not panel:
-            await interaction.response.send_message(
-                "❌ Panel not found.",
-                ephemeral=True
-            )
-            return
-        
-        # Find option by ID
-        option = next(
-            (o for o in panel.get("options", []) if o.get("id") == self.option_id),
-            None
-        )
-        
-        if not option:
+        if not resolved:
             await interaction.response.send_message(
                 "❌ This option is no longer available.",
                 ephemeral=True
             )
             return
 
+        _, option = resolved
+
         option_type = option.get("type", "ticket")
 
         # ───────────── TICKET OPTION ─────────────
@@ -97,7 +86,7 @@ class TicketButton(discord.ui.Button):
                 return
 
             storage = EmbedStorage()
-            embed_data = storage.load_embed(self.guild_id, embed_name)
+            embed_data = await storage.aload_embed(interaction.guild_id, embed_name)
 
             if not embed_data:
                 await interaction.response.send_message(
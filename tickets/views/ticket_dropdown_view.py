@@ -9,93 +9,113 @@ from utils.embed_storage import EmbedStorage
 
 class TicketDropdownView(discord.ui.View):
     """
-    Persistent dropdown view for ticket panels.
+    View used to post a dropdown panel.
     Supports:
     - ticket options (create ticket)
     - embed options (send embed ephemerally)
+
+    Selections are routed by the TicketDropdown DynamicItem registered once
+    at startup, so posted panels need no per-panel registration.
     """
 
-    def __init__(self, guild_id: int, panel_name: str):
+    def __init__(self, panel: dict):
         super().__init__(timeout=None)
 
-        self.guild_id = guild_id
-        self.panel_name = panel_name
-        self.storage = PanelStorage()
-
-        panel = self.storage.get_panel(guild_id, panel_name)
-        if not panel:
-            return
-
-        options = panel.get("options", [])
-        if not options:
-            return
-
-        self.add_item(TicketDropdown(options, guild_id, panel_name))
-
-
-class TicketDropdown(discord.ui.Select):
-    def __init__(self, options: list[dict], guild_id: int, panel_name: str):
-        self.guild_id = guild_id
-        self.panel_name = panel_name
-        self.options_data: dict[str, dict] = {}
+        self.add_item(TicketDropdown(panel.get("id"), panel.get("options", [])))
 
-        select_options: list[discord.SelectOption] = []
 
-        for index, opt in enumerate(options):
-            # ───────────── STABLE OPTION ID ─────────────
-            option_id = opt.get("id")
-            if not option_id:
-                option_id = f"legacy_{index}"
-                opt["id"] = option_id
+class TicketDropdown(
+    discord.ui.DynamicItem[discord.ui.Select],
+    # Dropdowns posted before panels had IDs all share plain "panel_dropdown"
+    template=r"panel_dropdown(?::(?P<panel_id>[\w-]+))?"
+):
+    def __init__(self, panel_id: str | None, options: list[dict] | None = None):
+        self.panel_id = panel_id
 
-            self.options_data[option_id] = opt
-
-            select_options.append(
-                discord.SelectOption(
-                    label=opt.get("label", "Option")[:100],
-                    description=(opt.get("description") or "")[:100],
-                    emoji=parse_emoji(opt.get("emoji")),
-                    value=option_id
-                )
+        select_options: list[discord.SelectOption] = [
+            discord.SelectOption(
+                label=opt.get("label", "Option")[:100],
+                description=(opt.get("description") or "")[:100],
+                emoji=parse_emoji(opt.get("emoji")),
+                # Stable option ID (guaranteed by the panel schema migration)
+                value=opt["id"]
             )
+            for opt in options or []
+        ]
 
         super().__init__(
-            placeholder="Select an option…",
-            min_values=1,
-            max_values=1,
-            custom_id="panel_dropdown",  # ✅ PERSISTENT ID
-            options=select_options
+            discord.ui.Select(
+                placeholder="Select an option…",
+                min_values=1,
+                max_values=1,
+                custom_id=f"panel_dropdown:{panel_id}" if panel_id else "panel_dropdown",
+                options=select_options
+            )
         )
 
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match):
+        return cls(match["panel_id"])
+
+    async def _resolve_panel_name(self, interaction: discord.Interaction, storage: PanelStorage):
+        """
+        Which panel this dropdown belongs to: from the custom_id when it
+        carries the panel id, else (dropdowns posted before panels had ids)
+        from the option labels of the message.
+        """
+        guild_id = interaction.guild_id
+        if self.panel_id:
+            return await storage.aresolve_panel(guild_id, self.panel_id)
+
+        message = interaction.message
+        if message is None:
+            return None
+
+        panel_name = await storage.aresolve_message(guild_id, message.id)
+        if panel_name:
+            return panel_name
+
+        # Match the dropdown's labels against the guild's panels once, then
+        # remember the message in the routing index (no write to storage)
+        labels = self._message_labels(message)
+        if not labels:
+            return None
+
+        panels = await storage.aload_panels(guild_id)
+        for name, panel in panels.items():
+            if [opt.get("label", "Option")[:100] for opt in panel.get("options", [])] == labels:
+                storage.remember_message(guild_id, message.id, name)
+                return name
+        return None
+
+    def _message_labels(self, message: discord.Message) -> list[str]:
+        for row in message.components:
+            for component in getattr(row, "children", []):
+                if getattr(component, "custom_id", None) == self.item.custom_id:
+                    return [opt.label for opt in component.options]
+        return []
+
     async def callback(self, interaction: discord.Interaction):
-        option_id = self.values[0]
+        option_id = self.item.values[0]
+        guild_id = interaction.guild_id
         
         # Defer early to prevent timeouts on long operations
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=True)
         
-        # Load panel fresh from storage to handle panel edits and restarts
+        # Resolve the option through the routing index (kept current on
+        # every save, so panel edits and restarts are handled)
         storage = PanelStorage()
-        panel = storage.get_panel(self.guild_id, self.panel_name)
-        
-        if not panel:
-            await interaction.followup.send(
-                "❌ Panel configuration not found.",
-                ephemeral=True
-            )
-            return
-        
-        # Try to find option by ID first
-        option = next(
-            (o for o in panel.get("options", []) if o.get("id") == option_id),
-            None
-        )
+        resolved = await storage.aresolve_option(guild_id, option_id)
+        option = resolved[1] if resolved else None
         
-        # Fallback: if option_id is legacy_{index}, try to extract the index
+        # Fallback: dropdowns posted by older versions used legacy_{index} values
         if not option and option_id.startswith("legacy_"):
+            panel_name = await self._resolve_panel_name(interaction, storage)
+            panel = await storage.aget_panel(guild_id, panel_name) if panel_name else None
             try:
                 index = int(option_id.split("_")[1])
-                options = panel.get("options", [])
+                options = panel.get("options", []) if panel else []
                 if 0 <= index < len(options):
                     option = options[index]
             except (ValueError, IndexError):
@@ -127,7 +147,7 @@ class TicketDropdown(discord.ui.Select):
                 return
 
             storage = EmbedStorage()
-            embed_data = storage.load_embed(interaction.guild.id, embed_name)
+            embed_data = await storage.aload_embed(guild_id, embed_name)
 
             if not embed_data:
                 await interaction.followup.send(
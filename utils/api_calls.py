@@ -0,0 +1,69 @@
+import contextvars
+import os
+from contextlib import contextmanager
+
+# LOG_API_CALLS=1 prints the REST calls each counted flow made
+LOG_API_CALLS = os.getenv("LOG_API_CALLS", "0") == "1"
+
+_current = contextvars.ContextVar("api_call_counter", default=None)
+
+
+class ApiCallCounter:
+    """REST calls made inside one count_api_calls() block."""
+
+    def __init__(self, flow: str, parent=None):
+        self.flow = flow
+        self.parent = parent  # Enclosing count_api_calls() block, also counts our calls
+        self.calls = []       # "METHOD /path/{template}"
+        self.closed = False
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    def __repr__(self):
+        return f"<ApiCallCounter {self.flow}: {self.count} call(s)>"
+
+
+def install(http):
+    """
+    Wrap ``http.request`` (discord.py's HTTPClient, i.e. ``bot.http``) so
+    calls made inside count_api_calls() are recorded. Interaction
+    responses and followups go through the webhook adapter, not this
+    client, and are therefore not counted. Safe to call more than once.
+    """
+    if getattr(http.request, "_counted", False):
+        return
+
+    request = http.request
+
+    async def counted_request(route, **kwargs):
+        counter = _current.get()
+        while counter is not None:
+            # Tasks started in a block may outlive it; their later calls aren't its own
+            if not counter.closed:
+                counter.calls.append(f"{route.method} {route.path}")
+            counter = counter.parent
+        return await request(route, **kwargs)
+
+    counted_request._counted = True
+    http.request = counted_request
+
+
+@contextmanager
+def count_api_calls(flow: str):
+    """
+    ``with count_api_calls("ticket_open") as calls: ...`` - ``calls.count``
+    is the number of REST requests made in the block (including tasks it
+    started, which inherit the context, while the block runs). Blocks
+    nest: the outer counter includes the inner block's calls.
+    """
+    counter = ApiCallCounter(flow, _current.get())
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        counter.closed = True
+        _current.reset(token)
+        if LOG_API_CALLS:
+            print(f"📡 {flow}: {counter.count} API call(s) {counter.calls}")
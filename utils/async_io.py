@@ -0,0 +1,22 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded pool for blocking storage calls, so slow disks queue up here
+# instead of stalling the event loop (and the gateway heartbeat).
+STORAGE_IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", "4"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=STORAGE_IO_THREADS,
+    thread_name_prefix="storage-io"
+)
+
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking storage call on the storage thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        functools.partial(func, *args, **kwargs)
+    )
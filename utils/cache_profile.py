@@ -0,0 +1,102 @@
+import os
+
+import discord
+
+# CACHE_PROFILE picks the gateway intents and client caches:
+#   default - discord.py's defaults (Intents.default(), 1000 cached
+#             messages), what the bot always ran with. Default.
+#   ticket  - only what panels and tickets use: guilds, channels, roles
+#             and the bot's own member. No member list, no message cache,
+#             no chunking at startup. Members are resolved from the
+#             interaction payload or fetched on demand (resolve_member).
+#             Opt-in: cogs that read other gateway events get none.
+#   full    - default plus the privileged members intent, every member
+#             cached and every guild chunked at startup. Needs "Server
+#             Members Intent" enabled in the developer portal.
+CACHE_PROFILE = os.getenv("CACHE_PROFILE", "default").lower()
+
+# Optional overrides on top of the profile
+MAX_MESSAGES = os.getenv("MAX_MESSAGES")                    # "0" disables the message cache
+CHUNK_GUILDS_AT_STARTUP = os.getenv("CHUNK_GUILDS_AT_STARTUP")  # "1" / "0"
+
+PROFILES = ("default", "ticket", "full")
+
+
+def _ticket_intents() -> discord.Intents:
+    intents = discord.Intents.none()
+    # Guild create/update/delete plus channels, roles and threads: panels,
+    # categories, the support role and ticket channels all come from here
+    intents.guilds = True
+    return intents
+
+
+def client_options(profile: str = None) -> dict:
+    """
+    Keyword arguments for commands.Bot / AutoShardedBot: ``intents``,
+    ``member_cache_flags``, ``max_messages`` and ``chunk_guilds_at_startup``.
+    """
+    profile = (profile or CACHE_PROFILE).lower()
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown CACHE_PROFILE {profile!r} (expected one of {', '.join(PROFILES)})")
+
+    if profile == "ticket":
+        intents = _ticket_intents()
+        options = {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "max_messages": None,
+            "chunk_guilds_at_startup": False
+        }
+    elif profile == "default":
+        intents = discord.Intents.default()
+        options = {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+            "max_messages": 1000,
+            "chunk_guilds_at_startup": False
+        }
+    else:
+        intents = discord.Intents.default()
+        intents.members = True
+        options = {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.all(),
+            "max_messages": 1000,
+            "chunk_guilds_at_startup": True
+        }
+
+    if MAX_MESSAGES is not None:
+        options["max_messages"] = int(MAX_MESSAGES) or None
+    if CHUNK_GUILDS_AT_STARTUP is not None:
+        # discord.py refuses to chunk without the members intent
+        options["chunk_guilds_at_startup"] = CHUNK_GUILDS_AT_STARTUP == "1" and intents.members
+    return options
+
+
+def describe(options: dict) -> str:
+    """One-line summary for the startup log."""
+    flags = options["member_cache_flags"]
+    member_cache = ", ".join(name for name, enabled in flags if enabled) or "self only"
+    return (
+        f"members intent {'on' if options['intents'].members else 'off'}, "
+        f"member cache: {member_cache}, "
+        f"message cache: {options['max_messages'] or 'off'}, "
+        f"chunking: {'on' if options['chunk_guilds_at_startup'] else 'off'}"
+    )
+
+
+# ===============================
+# LAZY MEMBER RESOLUTION
+# ===============================
+async def resolve_member(guild: discord.Guild, user_id: int):
+    """
+    The member from the cache when the profile keeps one, otherwise one
+    REST call. None if the user left the guild.
+    """
+    member = guild.get_member(user_id)
+    if member is not None:
+        return member
+    try:
+        return await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+
+from utils.json_cache import read_json
+from utils.json_writer import atomic_write_json
+
+# Hash of the last command tree pushed to Discord (per application)
+SYNC_STATE_PATH = os.getenv("COMMAND_SYNC_STATE", "data/command_sync.json")
+
+
+def _command_payload(command, tree):
+    # discord.py >= 2.4 passes the tree (for localisation); older
+    # versions take no argument
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+
+def tree_hash(tree) -> str:
+    """sha256 of the serialized global command tree (names, options, permissions)."""
+    payload = sorted(
+        (_command_payload(command, tree) for command in tree.get_commands()),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def sync_commands(bot, force: bool = False):
+    """
+    Push the command tree to Discord only if it changed since the last
+    sync by this application (or when ``force`` is set).
+
+    Returns:
+        Number of synced commands, or None if the sync was skipped
+    """
+    digest = tree_hash(bot.tree)
+    key = str(bot.application_id)
+
+    state = read_json(SYNC_STATE_PATH)
+    if not force and state.get(key) == digest:
+        return None
+
+    synced = await bot.tree.sync()
+
+    state[key] = digest
+    atomic_write_json(SYNC_STATE_PATH, state, indent=4)
+    return len(synced)
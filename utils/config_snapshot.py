@@ -0,0 +1,230 @@
+import json
+import mmap
+import os
+import struct
+import threading
+
+from utils.data_layout import DATA_DIR, KINDS, iter_guild_files
+from utils.json_cache import file_stamp, read_json
+
+# Set CONFIG_SNAPSHOT=0 to always parse the per-guild JSON files directly.
+CONFIG_SNAPSHOT = os.getenv("CONFIG_SNAPSHOT", "1") == "1"
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(DATA_DIR, "config.snapshot"))
+
+MAGIC = b"GBSNAP\x00\x00"
+VERSION = 1
+
+# File layout (little endian):
+#   HEADER                        magic, format version, record count
+#   RECORD * count                source mtime_ns, source size, blob offset,
+#                                 blob length, path length
+#   path bytes (utf-8, concatenated in record order)
+#   blobs (compact JSON, one per source file)
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<qqQII")
+
+
+def _key(path: str) -> str:
+    return os.path.normpath(path)
+
+
+def _compact(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ConfigSnapshot:
+    """
+    Single memory-mapped file holding a compact copy of every per-guild
+    panel, embed and settings file.
+
+    The JSON files remain the source of truth: each entry remembers the
+    (mtime_ns, size) stamp of the file it was copied from and is only
+    served while that stamp still matches, and the storage classes drop
+    it as soon as they write (or hear about a write to) the file, so a
+    write within the stamp's resolution can't be masked. Opening the
+    snapshot reads just the record table; a guild's blob is decoded on
+    its first read.
+
+    rebuild() is incremental: blobs whose source file is unchanged are
+    copied across byte for byte, only changed files are parsed again.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._entries = {}  # path -> (stamp, offset, length)
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ===============================
+    # OPEN / CLOSE
+    # ===============================
+    def open(self) -> int:
+        """Map the snapshot file if present; returns the number of entries."""
+        with self._lock:
+            self._close()
+            self._open()
+            return len(self._entries)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        try:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._entries = self._read_index(self._map)
+        except (OSError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"⚠️ Ignoring unreadable config snapshot {self.path}: {e}")
+            self._close()
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
+        self._entries = {}
+
+    @staticmethod
+    def _read_index(buf) -> dict:
+        magic, version, count = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("unknown snapshot format")
+
+        records_end = HEADER.size + count * RECORD.size
+        records = RECORD.iter_unpack(buf[HEADER.size:records_end]) if count else ()
+
+        entries = {}
+        cursor = records_end
+        for mtime_ns, size, offset, length, path_length in records:
+            path = buf[cursor:cursor + path_length].decode("utf-8")
+            cursor += path_length
+            entries[path] = ((mtime_ns, size), offset, length)
+        return entries
+
+    # ===============================
+    # READ
+    # ===============================
+    def read(self, path: str, stamp):
+        """
+        Decoded copy of ``path`` if the snapshot holds it at ``stamp``
+        (see utils.json_cache.file_stamp), otherwise None.
+        """
+        if stamp is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(_key(path))
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            _, offset, length = entry
+            blob = self._map[offset:offset + length]
+            self.hits += 1
+
+        return json.loads(blob)
+
+    def load(self, path: str) -> dict:
+        """Like read_json(), but served from the snapshot when it is current."""
+        stamp = file_stamp(path)
+        data = self.read(path, stamp)
+        if data is not None:
+            return data
+        return read_json(path) if stamp is not None else {}
+
+    def invalidate(self, path: str):
+        """``path`` was written: stop serving it until the next rebuild()."""
+        with self._lock:
+            self._entries.pop(_key(path), None)
+
+    # ===============================
+    # REBUILD
+    # ===============================
+    def rebuild(self) -> dict:
+        """
+        Bring the snapshot in line with the JSON tree and remap it.
+        Returns how many entries were reused, re-encoded and dropped.
+        """
+        stats = {"reused": 0, "encoded": 0, "dropped": 0}
+        records = []  # (path, stamp, blob)
+
+        # Reads keep being served from the current mapping while the new
+        # file is assembled; they only wait for the final swap.
+        with self._rebuild_lock:
+            with self._lock:
+                old_entries = dict(self._entries)
+                old_map = self._map
+
+            for kind in KINDS:
+                for _, path in iter_guild_files(kind):
+                    key = _key(path)
+                    stamp = file_stamp(path)
+                    if stamp is None:
+                        continue
+
+                    old = old_entries.pop(key, None)
+                    if old is not None and old[0] == stamp:
+                        _, offset, length = old
+                        records.append((key, stamp, old_map[offset:offset + length]))
+                        stats["reused"] += 1
+                        continue
+
+                    records.append((key, stamp, _compact(read_json(path))))
+                    stats["encoded"] += 1
+
+            stats["dropped"] = len(old_entries)
+            if stats["encoded"] == 0 and stats["dropped"] == 0 and old_map is not None:
+                return stats
+
+            tmp_path = self._write(records)
+            with self._lock:
+                # The old mapping must be released before the rename (Windows)
+                self._close()
+                os.replace(tmp_path, self.path)
+                self._open()
+
+        return stats
+
+    def _write(self, records: list) -> str:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+
+        paths = [key.encode("utf-8") for key, _, _ in records]
+        offset = HEADER.size + len(records) * RECORD.size + sum(len(p) for p in paths)
+
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+            for (_, stamp, blob), path in zip(records, paths):
+                f.write(RECORD.pack(stamp[0], stamp[1], offset, len(blob), len(path)))
+                offset += len(blob)
+            for path in paths:
+                f.write(path)
+            for _, _, blob in records:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        return tmp_path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": len(self._map) if self._map is not None else 0,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Shared by every storage class. Stays empty (every read misses) until
+# bot.py opens it, and when CONFIG_SNAPSHOT=0.
+config_snapshot = ConfigSnapshot()
@@ -0,0 +1,184 @@
+import filecmp
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DATA_DIR = "data"
+
+# "flat":    the original layout (data/ticket_panels/{id}.json,
+#            data/embeds_{id}.json, data/settings/{id}.json). Default.
+# "sharded": data/{kind}/{xx}/{guild_id}.json, where xx is a hash prefix, so
+#            no single directory holds more than a few hundred files.
+#            Opt-in: the first start with it moves the flat files over
+#            (see migrate_to_sharded), so switch back only after moving
+#            them back by hand.
+DATA_LAYOUT = os.getenv("DATA_LAYOUT", "flat").lower()
+
+# Legacy files that differ from their already sharded copy are moved here
+# by the migration instead of being left next to it
+LEGACY_DUPLICATES_DIR = os.path.join(DATA_DIR, "legacy_duplicates")
+
+PRELOAD_THREADS = int(os.getenv("PRELOAD_THREADS", "8"))
+
+# kind -> (sharded root, legacy flat directory, legacy file prefix)
+KINDS = {
+    "panels": (os.path.join(DATA_DIR, "ticket_panels"), os.path.join(DATA_DIR, "ticket_panels"), ""),
+    "embeds": (os.path.join(DATA_DIR, "embeds"), DATA_DIR, "embeds_"),
+    "settings": (os.path.join(DATA_DIR, "settings"), os.path.join(DATA_DIR, "settings"), ""),
+}
+
+
+def shard_of(guild_id: int) -> str:
+    """Two hex chars (256 buckets), stable across processes and restarts."""
+    return hashlib.md5(str(guild_id).encode()).hexdigest()[:2]
+
+
+def _legacy_path(kind: str, guild_id: int) -> str:
+    _, flat_dir, prefix = KINDS[kind]
+    return os.path.join(flat_dir, f"{prefix}{guild_id}.json")
+
+
+def _sharded_path(kind: str, guild_id: int) -> str:
+    root, _, _ = KINDS[kind]
+    return os.path.join(root, shard_of(guild_id), f"{guild_id}.json")
+
+
+def guild_file(kind: str, guild_id: int) -> str:
+    """Path of a guild's JSON file for ``kind`` (panels / embeds / settings)."""
+    if DATA_LAYOUT == "flat":
+        return _legacy_path(kind, guild_id)
+    return _sharded_path(kind, guild_id)
+
+
+def _scan_flat(kind: str):
+    _, flat_dir, prefix = KINDS[kind]
+    if not os.path.isdir(flat_dir):
+        return
+
+    with os.scandir(flat_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.startswith(prefix) or not name.endswith(".json"):
+                continue
+            guild_part = name[len(prefix):-len(".json")]
+            if guild_part.isdigit() and entry.is_file():
+                yield int(guild_part), entry.path
+
+
+def _scan_sharded(kind: str):
+    root, _, _ = KINDS[kind]
+    if not os.path.isdir(root):
+        return
+
+    with os.scandir(root) as shards:
+        for shard in shards:
+            if len(shard.name) != 2 or not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as entries:
+                for entry in entries:
+                    guild_part = entry.name[:-len(".json")]
+                    if entry.name.endswith(".json") and guild_part.isdigit():
+                        yield int(guild_part), entry.path
+
+
+def iter_guild_files(kind: str, include_legacy: bool = False):
+    """
+    Yield (guild_id, path) for every stored guild of ``kind``, using
+    os.scandir so directory entries don't need a stat each.
+    ``include_legacy`` also yields flat-layout files not yet migrated.
+    """
+    if DATA_LAYOUT == "flat":
+        yield from _scan_flat(kind)
+        return
+
+    seen = set()
+    for guild_id, path in _scan_sharded(kind):
+        seen.add(guild_id)
+        yield guild_id, path
+
+    if include_legacy:
+        for guild_id, path in _scan_flat(kind):
+            if guild_id not in seen:
+                yield guild_id, path
+
+
+# ===============================
+# FLAT -> SHARDED MIGRATION
+# ===============================
+def migrate_to_sharded() -> dict:
+    """
+    Move legacy flat files into the sharded layout (DATA_LAYOUT=sharded).
+
+    Files already present in the sharded tree win (they are newer): a
+    legacy duplicate with the same content is deleted, one that differs
+    is moved to LEGACY_DUPLICATES_DIR so nothing is lost silently.
+    Returns ``{"moved": {kind: count}, "removed": count, "set_aside": [path, ...]}``.
+    """
+    result = {"moved": {kind: 0 for kind in KINDS}, "removed": 0, "set_aside": []}
+    if DATA_LAYOUT == "flat":
+        return result
+
+    for kind in KINDS:
+        for guild_id, path in list(_scan_flat(kind)):
+            target = _sharded_path(kind, guild_id)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+                result["moved"][kind] += 1
+            elif filecmp.cmp(path, target, shallow=False):
+                os.remove(path)
+                result["removed"] += 1
+            else:
+                aside = os.path.join(LEGACY_DUPLICATES_DIR, kind, f"{int(time.time())}-{os.path.basename(path)}")
+                os.makedirs(os.path.dirname(aside), exist_ok=True)
+                os.replace(path, aside)
+                result["set_aside"].append(aside)
+
+    return result
+
+
+def count_sharded_files() -> int:
+    """Files in the sharded tree; with DATA_LAYOUT=flat these aren't read."""
+    return sum(1 for kind in KINDS for _ in _scan_sharded(kind))
+
+
+# ===============================
+# PARALLEL PRELOAD
+# ===============================
+def preload(kind: str, load, guild_ids=None, guild_filter=None,
+            max_workers: int = PRELOAD_THREADS) -> dict:
+    """
+    Call ``load(guild_id)`` for every stored guild of ``kind`` (or the
+    given ``guild_ids``) on a thread pool so file reads overlap. Used to
+    warm the storage caches. ``guild_filter(guild_id)`` restricts the set,
+    e.g. to the guilds of this process's shards.
+    Returns files, errors, seconds and files_per_sec.
+    """
+    started = time.perf_counter()
+    if guild_ids is None:
+        guild_ids = (guild_id for guild_id, _ in iter_guild_files(kind))
+    if guild_filter is not None:
+        guild_ids = filter(guild_filter, guild_ids)
+    guild_ids = list(guild_ids)
+    errors = 0
+
+    def _load(guild_id):
+        try:
+            load(guild_id)
+            return True
+        except Exception as e:
+            print(f"⚠️ Failed to preload {kind} for guild {guild_id}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"preload-{kind}") as pool:
+        for ok in pool.map(_load, guild_ids):
+            errors += not ok
+
+    seconds = time.perf_counter() - started
+    return {
+        "files": len(guild_ids),
+        "errors": errors,
+        "seconds": seconds,
+        "files_per_sec": len(guild_ids) / seconds if seconds > 0 else 0.0
+    }
@@ -1,50 +1,85 @@
-import json
+import functools
 import os
 from typing import Optional, Dict, List
 import discord
 
+from utils.async_io import run_io
+from utils.config_snapshot import config_snapshot
+from utils.data_layout import guild_file, preload
+from utils.invalidation import bus
+from utils.json_cache import JsonFileCache
+from utils.json_writer import write_behind
+from utils.revisions import KeyedLocks, next_revision
+from utils.sqlite_storage import get_sqlite_storage
+
+# Serializes read-modify-write of one guild's file without blocking others
+_guild_locks = KeyedLocks()
+
+# Shared by every EmbedStorage instance; filled by preload() and on first read
+EMBED_CACHE_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+_cache = JsonFileCache(EMBED_CACHE_MAX_BYTES, source=config_snapshot)
+
 class EmbedStorage:
     """
-    Manages guild-wise embed storage using JSON files.
-    Each guild has its own file: data/embeds_{guild_id}.json
+    Manages guild-wise embed storage.
+    JSON backend: each guild has its own file data/embeds/{xx}/{guild_id}.json
+    (see utils.data_layout)
+    SQLite backend (STORAGE_BACKEND=sqlite): one row per (guild, embed)
     """
     
     def __init__(self):
-        self.data_dir = "data"
-        # Create data directory if it doesn't exist
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        self.db = get_sqlite_storage()
     
     def _get_guild_file(self, guild_id: int) -> str:
         """Get the file path for a guild's embeds."""
-        return os.path.join(self.data_dir, f"embeds_{guild_id}.json")
+        return guild_file("embeds", guild_id)
     
     def _load_guild_data(self, guild_id: int) -> Dict:
         """Load all embeds for a guild."""
+        if self.db:
+            return self.db.load_all("embeds", guild_id)
+
         file_path = self._get_guild_file(guild_id)
+
+        # A save may still be queued in the write-behind buffer
+        pending = write_behind.pending(file_path)
+        if pending is not None:
+            return pending
         
-        if not os.path.exists(file_path):
-            return {}
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+        # Served from memory unless the file changed on disk since last read
+        return _cache.load(file_path)
     
     def _save_guild_data(self, guild_id: int, data: Dict) -> bool:
         """Save all embeds for a guild."""
+        if self.db:
+            self.db.replace_all("embeds", guild_id, data)
+            bus.publish("embeds", guild_id)
+            return True
+
         file_path = self._get_guild_file(guild_id)
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Atomic temp-file + rename, coalesced with other saves to this guild
+            write_behind.schedule(
+                file_path,
+                data,
+                indent=2,
+                on_flush=functools.partial(self._on_flushed, guild_id)
+            )
             return True
         except Exception as e:
             print(f"Error saving guild data: {e}")
             return False
+
+    @staticmethod
+    def _on_flushed(guild_id: int, path: str, data: Dict):
+        config_snapshot.invalidate(path)
+        _cache.store(path, data)
+        # Other worker processes drop their copy (see utils.invalidation)
+        bus.publish("embeds", guild_id)
     
-    def save_embed(self, guild_id: int, embed_name: str, embed_state: Dict) -> bool:
+    def save_embed(self, guild_id: int, embed_name: str, embed_state: Dict,
+                   expected_revision: Optional[int] = None) -> bool:
         """
         Save an embed for a specific guild.
         
@@ -52,13 +87,31 @@ class EmbedStorage:
             guild_id: Discord guild ID
             embed_name: Name of the embed
             embed_state: Dictionary containing embed data
+            expected_revision: Only save if the stored embed is still at this
+                revision (None = overwrite unconditionally)
         
         Returns:
             True if successful, False otherwise
+
+        Raises:
+            StaleWriteError: the embed was saved by someone else since
+                ``expected_revision`` was read
+
+        ``embed_state["revision"]`` is bumped in place on success.
         """
-        guild_data = self._load_guild_data(guild_id)
-        guild_data[embed_name] = embed_state
-        return self._save_guild_data(guild_id, guild_data)
+        if self.db:
+            embed_state["revision"] = self.db.compare_and_set(
+                "embeds", guild_id, embed_name, embed_state, expected_revision
+            )
+            bus.publish("embeds", guild_id)
+            return True
+
+        with _guild_locks.hold(guild_id):
+            guild_data = self._load_guild_data(guild_id)
+            revision = next_revision(embed_name, guild_data.get(embed_name), expected_revision)
+            embed_state["revision"] = revision
+            guild_data[embed_name] = embed_state
+            return self._save_guild_data(guild_id, guild_data)
     
     def load_embed(self, guild_id: int, embed_name: str) -> Optional[Dict]:
         """
@@ -71,6 +124,9 @@ class EmbedStorage:
         Returns:
             Embed state dictionary or None if not found
         """
+        if self.db:
+            return self.db.get("embeds", guild_id, embed_name)
+
         guild_data = self._load_guild_data(guild_id)
         return guild_data.get(embed_name)
     
@@ -85,12 +141,18 @@ class EmbedStorage:
         Returns:
             True if deleted, False if not found
         """
-        guild_data = self._load_guild_data(guild_id)
-        
-        if embed_name in guild_data:
-            del guild_data[embed_name]
-            self._save_guild_data(guild_id, guild_data)
-            return True
+        if self.db:
+            deleted = self.db.delete("embeds", guild_id, embed_name)
+            bus.publish("embeds", guild_id)
+            return deleted
+
+        with _guild_locks.hold(guild_id):
+            guild_data = self._load_guild_data(guild_id)
+            
+            if embed_name in guild_data:
+                del guild_data[embed_name]
+                self._save_guild_data(guild_id, guild_data)
+                return True
         
         return False
     
@@ -104,6 +166,9 @@ class EmbedStorage:
         Returns:
             List of embed names
         """
+        if self.db:
+            return self.db.names("embeds", guild_id)
+
         guild_data = self._load_guild_data(guild_id)
         return list(guild_data.keys())
     
@@ -118,5 +183,46 @@ class EmbedStorage:
         Returns:
             True if exists, False otherwise
         """
+        if self.db:
+            return self.db.exists("embeds", guild_id, embed_name)
+
         guild_data = self._load_guild_data(guild_id)
-        return embed_name in guild_data
\ No newline at end of file
+        return embed_name in guild_data
+
+    def preload_guild(self, guild_id: int):
+        """Warm the embed cache for one guild."""
+        self._load_guild_data(guild_id)
+
+    def preload(self, guild_filter=None) -> Dict:
+        """Warm the embed cache for every stored guild in parallel."""
+        guild_ids = self.db.guild_ids("embeds") if self.db else None
+        return preload("embeds", self.preload_guild, guild_ids, guild_filter)
+
+    def evict_guild(self, guild_id: int):
+        """Drop a guild's embeds from the in-memory cache."""
+        if not self.db:
+            config_snapshot.invalidate(self._get_guild_file(guild_id))
+            _cache.evict(self._get_guild_file(guild_id))
+
+    # ===============================
+    # ASYNC API (storage thread pool)
+    # ===============================
+    async def asave_embed(self, guild_id: int, embed_name: str, embed_state: Dict,
+                          expected_revision: Optional[int] = None) -> bool:
+        return await run_io(self.save_embed, guild_id, embed_name, embed_state, expected_revision)
+
+    async def aload_embed(self, guild_id: int, embed_name: str) -> Optional[Dict]:
+        return await run_io(self.load_embed, guild_id, embed_name)
+
+    async def adelete_embed(self, guild_id: int, embed_name: str) -> bool:
+        return await run_io(self.delete_embed, guild_id, embed_name)
+
+    async def alist_embeds(self, guild_id: int) -> List[str]:
+        return await run_io(self.list_embeds, guild_id)
+
+    async def aembed_exists(self, guild_id: int, embed_name: str) -> bool:
+        return await run_io(self.embed_exists, guild_id, embed_name)
+
+
+# Another worker process saved this guild's embeds
+bus.subscribe("embeds", lambda guild_id: EmbedStorage().evict_guild(guild_id))
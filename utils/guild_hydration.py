@@ -0,0 +1,129 @@
+import asyncio
+import itertools
+import os
+
+from tickets.panels.panel_storage import PanelStorage
+from utils.async_io import run_io
+from utils.embed_storage import EmbedStorage
+from utils.settings_storage import SettingsStorage
+
+# Lower number = loaded first
+PRIORITY_INTERACTION = 0   # someone is clicking/typing in the guild right now
+PRIORITY_AVAILABLE = 1     # guild came online (startup, outage recovery, join)
+
+HYDRATION_WORKERS = int(os.getenv("HYDRATION_WORKERS", "2"))
+
+
+class GuildHydrator:
+    """
+    Loads a guild's panels (and routing index), embeds and settings into
+    memory on demand instead of for every guild at startup.
+
+    Guilds are queued by priority: a guild with a pending interaction
+    jumps ahead of the backlog queued by on_guild_available. Loading runs
+    on the storage thread pool, so ready time doesn't depend on the
+    number of guilds. evict() forgets everything again (on_guild_remove).
+    """
+
+    def __init__(self, workers: int = HYDRATION_WORKERS):
+        self.workers = workers
+        self.panels = PanelStorage()
+        self.embeds = EmbedStorage()
+        self.settings = SettingsStorage()
+
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._order = itertools.count()  # FIFO within one priority
+
+        self._hydrated: set[int] = set()
+        self._queued: dict[int, int] = {}  # guild_id -> best queued priority
+        self._loading: set[int] = set()
+        self._evicted_while_loading: set[int] = set()
+
+    # ===============================
+    # LIFECYCLE
+    # ===============================
+    def start(self):
+        """Start the worker tasks (call from setup_hook, inside the event loop)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    # ===============================
+    # QUEUE
+    # ===============================
+    def request(self, guild_id: int, priority: int = PRIORITY_AVAILABLE):
+        """Queue a guild for loading; no-op if it's loaded or already queued at this priority."""
+        if self._queue is None or guild_id is None or guild_id in self._hydrated:
+            return
+
+        queued = self._queued.get(guild_id)
+        if queued is not None and queued <= priority:
+            return
+
+        # A re-request at a higher priority is pushed again; the stale
+        # lower-priority entry is skipped when it comes up
+        self._queued[guild_id] = priority
+        self._queue.put_nowait((priority, next(self._order), guild_id))
+
+    def is_hydrated(self, guild_id: int) -> bool:
+        return guild_id in self._hydrated
+
+    async def _worker(self):
+        while True:
+            priority, _, guild_id = await self._queue.get()
+            try:
+                if self._queued.get(guild_id) != priority:
+                    continue  # Superseded, or evicted while queued
+                del self._queued[guild_id]
+                await self._hydrate(guild_id)
+            except Exception as e:
+                print(f"⚠️ Failed to load data for guild {guild_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _hydrate(self, guild_id: int):
+        self._loading.add(guild_id)
+        try:
+            await run_io(self._load, guild_id)
+        finally:
+            self._loading.discard(guild_id)
+
+        if guild_id in self._evicted_while_loading:
+            # The bot left the guild mid-load: don't keep what was loaded
+            self._evicted_while_loading.discard(guild_id)
+            await run_io(self._drop, guild_id)
+            return
+
+        self._hydrated.add(guild_id)
+
+    def _load(self, guild_id: int):
+        self.panels.preload_guild(guild_id)
+        self.embeds.preload_guild(guild_id)
+        self.settings.get_guild_settings(guild_id)
+
+    # ===============================
+    # EVICTION
+    # ===============================
+    def evict(self, guild_id: int):
+        """Drop a guild's cached config, routing index and queue entry."""
+        self._hydrated.discard(guild_id)
+        self._queued.pop(guild_id, None)
+        if guild_id in self._loading:
+            self._evicted_while_loading.add(guild_id)
+        self._drop(guild_id)
+
+    def _drop(self, guild_id: int):
+        self.panels.evict_guild(guild_id)
+        self.embeds.evict_guild(guild_id)
+        self.settings.invalidate(guild_id)
+
+
+# Shared by bot.py (guild events) and anything that wants to hint a guild
+hydrator = GuildHydrator()
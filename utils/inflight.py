@@ -0,0 +1,39 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls: while ``run(key, ...)`` is in progress,
+    further calls with the same key wait for it and get the same result
+    (or exception) instead of running again. Nothing is cached afterwards.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> asyncio.Future of the running call
+
+    async def run(self, key, func, *args, **kwargs):
+        """Returns ``(result, shared)``; ``shared`` is True for coalesced callers."""
+        future = self._calls.get(key)
+        if future is not None:
+            # shield: a cancelled follower must not cancel the leader's call
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Followers re-raise it; don't warn if there are none
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def __len__(self):
+        return len(self._calls)
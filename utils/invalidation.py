@@ -0,0 +1,114 @@
+import queue
+import threading
+from collections import defaultdict
+
+# Message kinds published by the storage classes after a write reached
+# disk / the database: ("panels" | "embeds" | "settings", guild_id)
+KINDS = ("panels", "embeds", "settings")
+
+
+class InvalidationBus:
+    """
+    Tells other processes that a guild's stored config changed, so they
+    drop their cached copy (settings cache, routing index, file caches).
+
+    Unconnected (a single bot process) publish() is a no-op. launcher.py
+    connects every worker to a pair of multiprocessing queues (see
+    benchmarks/cross_worker_invalidation.py for a two-worker check).
+    A bus never delivers its own messages back to itself.
+    """
+
+    def __init__(self):
+        self.node_id = None
+        self._handlers = defaultdict(list)
+        self._send = None
+        self._listener = None
+
+    # ===============================
+    # SUBSCRIBE / PUBLISH
+    # ===============================
+    def subscribe(self, kind: str, handler):
+        """Call ``handler(guild_id)`` when another process changed ``kind``."""
+        self._handlers[kind].append(handler)
+
+    def publish(self, kind: str, guild_id: int):
+        if self._send is not None:
+            self._send((self.node_id, kind, guild_id))
+
+    def deliver(self, message):
+        origin, kind, guild_id = message
+        if origin == self.node_id:
+            return
+        for handler in self._handlers.get(kind, ()):
+            try:
+                handler(guild_id)
+            except Exception as e:
+                print(f"⚠️ Invalidation handler for {kind} failed: {e}")
+
+    # ===============================
+    # TRANSPORTS
+    # ===============================
+    def connect(self, node_id: int, outbox, inbox):
+        """
+        Cross-process mode: publish into ``outbox`` (relayed to the other
+        workers by the launcher) and apply messages read from ``inbox``
+        on a daemon thread.
+        """
+        self.node_id = node_id
+        self._send = outbox.put
+        self._listener = threading.Thread(
+            target=self._listen, args=(inbox,), name="invalidation-bus", daemon=True
+        )
+        self._listener.start()
+
+    def _listen(self, inbox):
+        while True:
+            try:
+                message = inbox.get()
+            except (EOFError, OSError):
+                return  # Launcher went away
+            if message is None:
+                return
+            self.deliver(message)
+
+
+class LocalHub:
+    """
+    In-process stand-in for the launcher's relay, for testing the bus
+    itself. It can't stand in for two workers: the storage modules and
+    their caches exist once per process, subscribed to the module-level
+    ``bus``.
+    """
+
+    def __init__(self):
+        self.buses = []
+
+    def attach(self, bus: InvalidationBus) -> InvalidationBus:
+        bus.node_id = len(self.buses)
+        bus._send = self.broadcast
+        self.buses.append(bus)
+        return bus
+
+    def broadcast(self, message):
+        for bus in self.buses:
+            bus.deliver(message)
+
+
+def relay(outbox, inboxes: list, stop: threading.Event):
+    """
+    Launcher side: fan every published message out to all workers.
+    (The publishing worker ignores its own message.)
+    """
+    while not stop.is_set():
+        try:
+            message = outbox.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError):
+            return
+        for inbox in inboxes:
+            inbox.put(message)
+
+
+# Shared by every storage class in this process
+bus = InvalidationBus()
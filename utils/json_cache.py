@@ -0,0 +1,143 @@
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost, so empty/missing files still count
+# towards the memory cap.
+ENTRY_OVERHEAD = 512
+
+# Files parsed by read_json() in this process (see read_json_count())
+_reads = 0
+_reads_lock = threading.Lock()
+
+
+def file_stamp(path: str):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def read_json(path: str) -> dict:
+    """Read a JSON file straight from disk ({} if missing or invalid)."""
+    global _reads
+    with _reads_lock:
+        _reads += 1
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+
+def read_json_count() -> int:
+    """Full-file parses so far; a warm restart should do none."""
+    return _reads
+
+
+class JsonFileCache:
+    """
+    Process-wide cache for JSON documents stored on disk.
+
+    Entries are keyed by file path and validated against the file's
+    mtime/size on every read, so an edit made outside the bot is picked up
+    on the next access. Saves write through the cache. Least recently used
+    entries are evicted once the cached files exceed ``max_bytes``.
+
+    Callers always receive a deep copy, so mutating a returned dict never
+    leaks into the cache.
+
+    ``transform`` (optional) is applied in place to every document parsed
+    from disk before it is cached, e.g. to upgrade an old schema in memory.
+
+    ``source`` (optional) is consulted on a miss before the file itself:
+    ``source.read(path, stamp)`` returns the document if it holds a copy
+    taken at that stamp, else None (see utils.config_snapshot).
+    """
+
+    def __init__(self, max_bytes: int, transform=None, source=None):
+        self.max_bytes = max_bytes
+        self.transform = transform
+        self.source = source
+        self._entries: OrderedDict = OrderedDict()  # path -> (stamp, weight, data)
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ===============================
+    # READ
+    # ===============================
+    def load(self, path: str) -> dict:
+        """Return the JSON document at ``path`` ({} if missing or invalid)."""
+        stamp = file_stamp(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return copy.deepcopy(entry[2])
+            self.misses += 1
+
+        # Parse outside the lock; a concurrent write just causes one extra
+        # reload because the stamp taken above will no longer match.
+        data = self.source.read(path, stamp) if self.source else None
+        if data is None:
+            data = read_json(path) if stamp is not None else {}
+        if self.transform and data:
+            self.transform(data)
+        self._put(path, stamp, data)
+        return copy.deepcopy(data)
+
+    # ===============================
+    # WRITE-THROUGH
+    # ===============================
+    def store(self, path: str, data: dict):
+        """Record ``data`` as the current content of ``path`` (after a save)."""
+        self._put(path, file_stamp(path), copy.deepcopy(data))
+
+    def evict(self, path: str):
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ===============================
+    # INTERNALS
+    # ===============================
+    def _put(self, path: str, stamp, data: dict):
+        weight = (stamp[1] if stamp else 0) + ENTRY_OVERHEAD
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[path] = (stamp, weight, data)
+            self._bytes += weight
+
+            # Evict idle guilds, but always keep the entry we just added
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, w, _) = self._entries.popitem(last=False)
+                self._bytes -= w
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,198 @@
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Saves to the same file within this many seconds are merged into one write.
+# 0 disables write-behind (every save is written immediately, still atomic).
+WRITE_BEHIND_DELAY = float(os.getenv("STORAGE_WRITE_DELAY", "0.5"))
+
+
+def atomic_write_json(path: str, data, indent=None):
+    """
+    Write JSON to a temp file in the same directory, fsync it and rename it
+    over ``path``. Readers see either the old or the new file, never a
+    truncated one.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp",
+        dir=directory
+    )
+
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehind:
+    """
+    Coalescing write-behind queue for JSON files.
+
+    ``schedule`` records the latest content for a path; a background thread
+    writes it out ``delay`` seconds after the first unflushed save, so a
+    burst of editor saves becomes a single atomic write. Until then
+    ``pending`` returns the queued content so reads see their own writes.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending = {}  # path -> (deadline, data, indent, on_flush)
+        self._inflight = {}  # path -> data currently being written
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+        self.scheduled = 0
+        self.written = 0
+
+    # ===============================
+    # PUBLIC API
+    # ===============================
+    def schedule(self, path: str, data, indent=None, on_flush=None):
+        """
+        Queue ``data`` to be written to ``path``.
+        ``on_flush(path, data)`` runs after the file has been written.
+        """
+        data = copy.deepcopy(data)
+        self.scheduled += 1
+
+        if self.delay <= 0:
+            with self._write_lock:
+                self._write(path, data, indent, on_flush)
+            return
+
+        with self._cond:
+            existing = self._pending.get(path)
+            # Keep the original deadline so constant saves can't starve the flush
+            deadline = existing[0] if existing else time.monotonic() + self.delay
+            self._pending[path] = (deadline, data, indent, on_flush)
+            self._ensure_thread()
+            self._cond.notify()
+
+    def pending(self, path: str):
+        """Return a copy of the queued content for ``path``, or None."""
+        with self._cond:
+            entry = self._pending.get(path)
+            if entry:
+                return copy.deepcopy(entry[1])
+            if path in self._inflight:
+                return copy.deepcopy(self._inflight[path])
+            return None
+
+    def is_queued(self, path: str) -> bool:
+        """True if a save for ``path`` is waiting for the next flush."""
+        with self._cond:
+            return path in self._pending
+
+    def is_dirty(self, path: str) -> bool:
+        """True if ``path`` has a queued or in-progress save."""
+        with self._cond:
+            return path in self._pending or path in self._inflight
+
+    def flush(self, path: str | None = None):
+        """Write queued content now (one path, or everything)."""
+        with self._write_lock:
+            with self._cond:
+                if path is None:
+                    paths = list(self._pending)
+                else:
+                    paths = [path] if path in self._pending else []
+                batch = self._take(paths)
+
+            self._write_batch(batch)
+
+    # ===============================
+    # INTERNALS
+    # ===============================
+    def _take(self, paths):
+        # Caller holds self._cond. Entries move to _inflight so reads keep
+        # seeing them until the write (and cache update) has finished.
+        batch = []
+        for p in paths:
+            _, data, indent, on_flush = self._pending.pop(p)
+            self._inflight[p] = data
+            batch.append((p, data, indent, on_flush))
+        return batch
+
+    def _write_batch(self, batch):
+        # Caller holds self._write_lock, so batches hit the disk in the
+        # order they were taken and an older save can't overwrite a newer one.
+        for p, data, indent, on_flush in batch:
+            ok = self._write(p, data, indent, on_flush)
+
+            with self._cond:
+                if self._inflight.get(p) is data:
+                    del self._inflight[p]
+
+                # Retry later unless a newer save has been queued meanwhile
+                if not ok and p not in self._pending:
+                    self._pending[p] = (time.monotonic() + max(self.delay, 1.0), data, indent, on_flush)
+                    self._cond.notify()
+
+    def _write(self, path, data, indent, on_flush) -> bool:
+        try:
+            atomic_write_json(path, data, indent)
+            self.written += 1
+        except Exception as e:
+            print(f"❌ Failed to write {path}: {e}")
+            return False
+
+        if on_flush:
+            on_flush(path, data)
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run,
+                name="json-write-behind",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                now = time.monotonic()
+                next_deadline = min(entry[0] for entry in self._pending.values())
+                if next_deadline > now:
+                    self._cond.wait(next_deadline - now)
+                    continue
+
+            with self._write_lock:
+                with self._cond:
+                    now = time.monotonic()
+                    due = [p for p, entry in self._pending.items() if entry[0] <= now]
+                    batch = self._take(due)
+
+                self._write_batch(batch)
+
+
+# Shared by PanelStorage and EmbedStorage
+write_behind = WriteBehind(WRITE_BEHIND_DELAY)
+
+
+def flush_all():
+    """Flush every queued save. Called on shutdown."""
+    write_behind.flush()
+
+
+atexit.register(flush_all)
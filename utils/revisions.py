@@ -0,0 +1,54 @@
+import threading
+import weakref
+from contextlib import contextmanager
+
+# Every saved panel/embed carries a per-record revision counter under this key.
+REVISION_KEY = "revision"
+
+
+class StaleWriteError(Exception):
+    """Raised when a save was based on an outdated revision of the record."""
+
+    def __init__(self, name: str, expected: int, current: int):
+        super().__init__(
+            f"'{name}' was changed by someone else "
+            f"(expected revision {expected}, found {current})"
+        )
+        self.name = name
+        self.expected = expected
+        self.current = current
+
+
+def next_revision(name: str, current_record, expected_revision=None) -> int:
+    """
+    Compare-and-swap check for a record about to be overwritten.
+    ``expected_revision=None`` skips the check (last writer wins).
+    Returns the revision the new record should be saved with.
+    """
+    current = (current_record or {}).get(REVISION_KEY, 0)
+    if expected_revision is not None and current != expected_revision:
+        raise StaleWriteError(name, expected_revision, current)
+    return current + 1
+
+
+class KeyedLocks:
+    """
+    One re-entrant lock per key (e.g. per guild), so read-modify-write on
+    one guild's file never blocks other guilds. Locks nobody holds are
+    dropped automatically.
+    """
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, key):
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.RLock()
+                self._locks[key] = lock
+
+        with lock:
+            yield
@@ -0,0 +1,145 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from utils.async_io import run_io
+from utils.config_snapshot import config_snapshot
+from utils.data_layout import guild_file, preload
+from utils.invalidation import bus
+from utils.json_writer import atomic_write_json
+from utils.revisions import KeyedLocks
+from utils.sqlite_storage import get_sqlite_storage
+
+
+@dataclass(frozen=True)
+class GuildSettings:
+    """Typed, read-only view of a guild's settings."""
+
+    support_team_role_id: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "GuildSettings":
+        role_id = data.get("support_team_role_id")
+        try:
+            role_id = int(role_id) if role_id else None
+        except (TypeError, ValueError):
+            role_id = None
+        return cls(support_team_role_id=role_id)
+
+
+# Process-wide: guild_id -> GuildSettings. Filled on first read and
+# replaced on every write, so permission checks are dict lookups.
+_cache: Dict[int, GuildSettings] = {}
+_cache_lock = threading.Lock()
+
+# Serializes read-modify-write of one guild's settings (set() runs on the
+# storage thread pool, so two writes for a guild can overlap)
+_guild_locks = KeyedLocks()
+
+
+class SettingsStorage:
+    """
+    Per-guild bot settings (e.g. support_team_role_id).
+    JSON backend: data/settings/{xx}/{guild_id}.json (see utils.data_layout)
+    SQLite backend: one row per (guild, key) in the settings table.
+    """
+
+    def __init__(self):
+        self.db = get_sqlite_storage()
+
+    def _get_guild_file(self, guild_id: int) -> str:
+        return guild_file("settings", guild_id)
+
+    def load_settings(self, guild_id: int) -> Dict:
+        """Load all settings for a guild ({} if none are set)."""
+        if self.db:
+            return self.db.load_all("settings", guild_id)
+
+        return config_snapshot.load(self._get_guild_file(guild_id))
+
+    def get(self, guild_id: int, key: str, default: Any = None) -> Any:
+        """Get a single setting value."""
+        if self.db:
+            value = self.db.get("settings", guild_id, key)
+            return default if value is None else value
+
+        return self.load_settings(guild_id).get(key, default)
+
+    def set(self, guild_id: int, key: str, value: Any) -> bool:
+        """
+        Set a single setting value.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with _guild_locks.hold(guild_id):
+            try:
+                if self.db:
+                    self.db.upsert("settings", guild_id, key, value)
+                    settings = self.db.load_all("settings", guild_id)
+                else:
+                    settings = self.load_settings(guild_id)
+                    settings[key] = value
+                    atomic_write_json(self._get_guild_file(guild_id), settings, indent=4)
+                    config_snapshot.invalidate(self._get_guild_file(guild_id))
+            except Exception as e:
+                print(f"Error saving guild settings: {e}")
+                self.invalidate(guild_id)
+                return False
+
+            with _cache_lock:
+                _cache[guild_id] = GuildSettings.from_dict(settings)
+        # Other worker processes drop their copy (see utils.invalidation)
+        bus.publish("settings", guild_id)
+        return True
+
+    # ===============================
+    # CACHED TYPED SETTINGS
+    # ===============================
+    def get_guild_settings(self, guild_id: int) -> GuildSettings:
+        """Cached typed settings; only the first call per guild touches storage."""
+        cached = _cache.get(guild_id)
+        if cached is not None:
+            return cached
+
+        settings = GuildSettings.from_dict(self.load_settings(guild_id))
+        with _cache_lock:
+            return _cache.setdefault(guild_id, settings)
+
+    def support_role_id(self, guild_id: int) -> Optional[int]:
+        return self.get_guild_settings(guild_id).support_team_role_id
+
+    def preload(self, guild_filter=None) -> Dict:
+        """Fill the settings cache for every stored guild in parallel."""
+        guild_ids = self.db.guild_ids("settings") if self.db else None
+        return preload("settings", self.get_guild_settings, guild_ids, guild_filter)
+
+    @staticmethod
+    def invalidate(guild_id: int):
+        """Forget a guild's cached settings (re-read on next access)."""
+        with _cache_lock:
+            _cache.pop(guild_id, None)
+        config_snapshot.invalidate(guild_file("settings", guild_id))
+
+    # ===============================
+    # ASYNC API (storage thread pool)
+    # ===============================
+    async def aload_settings(self, guild_id: int) -> Dict:
+        return await run_io(self.load_settings, guild_id)
+
+    async def aget(self, guild_id: int, key: str, default: Any = None) -> Any:
+        return await run_io(self.get, guild_id, key, default)
+
+    async def aset(self, guild_id: int, key: str, value: Any) -> bool:
+        return await run_io(self.set, guild_id, key, value)
+
+    async def aget_guild_settings(self, guild_id: int) -> GuildSettings:
+        # Cached guilds resolve inline without a thread hop
+        cached = _cache.get(guild_id)
+        if cached is not None:
+            return cached
+        return await run_io(self.get_guild_settings, guild_id)
+
+
+# Another worker process changed this guild's settings
+bus.subscribe("settings", SettingsStorage.invalidate)
@@ -0,0 +1,93 @@
+import os
+import time
+
+from discord.ext import commands
+
+# BOT_SHARDED=1 runs an AutoShardedBot. SHARD_COUNT / SHARD_IDS pin the
+# shards this process serves (e.g. SHARD_COUNT=8 SHARD_IDS=0,1,2,3); left
+# unset, Discord's recommended shard count is used and all shards run here.
+BOT_SHARDED = os.getenv("BOT_SHARDED", "0") == "1"
+SHARD_COUNT = int(os.environ["SHARD_COUNT"]) if os.getenv("SHARD_COUNT") else None
+SHARD_IDS = [
+    int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()
+] or None
+
+# Set by launcher.py for each worker process; None when bot.py runs standalone
+CLUSTER_WORKER_ID = int(os.environ["CLUSTER_WORKER_ID"]) if os.getenv("CLUSTER_WORKER_ID") else None
+
+
+def is_primary() -> bool:
+    """True for the one process that does cluster-wide work (e.g. command sync)."""
+    return CLUSTER_WORKER_ID in (None, 0)
+
+
+def shard_for(guild_id: int, shard_count: int) -> int:
+    """Discord's shard formula: (guild_id >> 22) % shard_count."""
+    return (guild_id >> 22) % shard_count
+
+
+def owns_guild(guild_id: int) -> bool:
+    """
+    Whether this process serves ``guild_id``. Always True unless the shard
+    layout is pinned through SHARD_COUNT (and optionally SHARD_IDS).
+    """
+    if not BOT_SHARDED or SHARD_COUNT is None:
+        return True
+    shard_ids = SHARD_IDS if SHARD_IDS is not None else range(SHARD_COUNT)
+    return shard_for(guild_id, SHARD_COUNT) in shard_ids
+
+
+def create_bot(**kwargs) -> commands.Bot:
+    """commands.Bot, or commands.AutoShardedBot when BOT_SHARDED=1."""
+    if not BOT_SHARDED:
+        return commands.Bot(**kwargs)
+
+    if SHARD_COUNT is not None:
+        kwargs["shard_count"] = SHARD_COUNT
+    if SHARD_IDS is not None:
+        kwargs["shard_ids"] = SHARD_IDS
+    return commands.AutoShardedBot(**kwargs)
+
+
+# ===============================
+# PER-SHARD STATUS
+# ===============================
+class ShardTracker:
+    """Readiness of each shard, fed by the on_shard_* events in bot.py."""
+
+    def __init__(self):
+        self._ready_at = {}  # shard_id -> time.monotonic() of the last ready/resume
+
+    def mark_ready(self, shard_id: int):
+        self._ready_at[shard_id] = time.monotonic()
+
+    def mark_down(self, shard_id: int):
+        self._ready_at.pop(shard_id, None)
+
+    def status(self, bot) -> list[dict]:
+        """One row per shard: id, ready, latency (seconds), guilds, uptime."""
+        guild_counts = {}
+        for guild in bot.guilds:
+            shard_id = guild.shard_id or 0
+            guild_counts[shard_id] = guild_counts.get(shard_id, 0) + 1
+
+        shards = getattr(bot, "shards", None)
+        if shards:
+            latencies = {shard_id: shard.latency for shard_id, shard in shards.items()}
+        else:
+            latencies = {0: bot.latency}
+
+        now = time.monotonic()
+        return [
+            {
+                "id": shard_id,
+                "ready": shard_id in self._ready_at,
+                "latency": latency,
+                "guilds": guild_counts.get(shard_id, 0),
+                "uptime": now - self._ready_at[shard_id] if shard_id in self._ready_at else 0.0
+            }
+            for shard_id, latency in sorted(latencies.items())
+        ]
+
+
+shard_tracker = ShardTracker()
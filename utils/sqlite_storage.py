@@ -0,0 +1,298 @@
+import json
+import os
+import sqlite3
+import threading
+
+from utils.data_layout import iter_guild_files
+from utils.revisions import REVISION_KEY, next_revision
+
+# Set STORAGE_BACKEND=sqlite to keep panels, embeds and guild settings in a
+# single SQLite database instead of one JSON file per guild.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/guibot.db")
+
+TABLES = ("panels", "embeds", "settings")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    guild_id INTEGER NOT NULL,
+    name     TEXT    NOT NULL,
+    data     TEXT    NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (guild_id, name)
+)
+"""
+
+UPSERT = (
+    "INSERT INTO {table} (guild_id, name, data, revision) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (guild_id, name) DO UPDATE "
+    "SET data = excluded.data, revision = excluded.revision"
+)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _revision_of(value) -> int:
+    return value.get(REVISION_KEY, 0) if isinstance(value, dict) else 0
+
+
+class SqliteStorage:
+    """
+    SQLite (WAL mode) backend shared by PanelStorage, EmbedStorage and
+    SettingsStorage.
+
+    Every table stores one row per (guild_id, name) with the record encoded
+    as JSON, so changing a single panel, embed or setting is a row-level
+    upsert instead of a full guild file rewrite. The UNIQUE constraint
+    doubles as the (guild, name) lookup index. Rows keep insertion order
+    (rowid), matching the ordering of the old JSON files. The ``revision``
+    column backs compare-and-swap saves (see compare_and_set).
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            for table in TABLES:
+                conn.execute(SCHEMA.format(table=table))
+
+                # Databases created before revision counters existed
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if "revision" not in columns:
+                    conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+                    )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared across threads; WAL lets the
+        # per-thread connections read concurrently with a writer.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _check(table: str):
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+
+    # ===============================
+    # READ
+    # ===============================
+    def get(self, table: str, guild_id: int, name: str):
+        self._check(table)
+        row = self._conn().execute(
+            f"SELECT data FROM {table} WHERE guild_id = ? AND name = ?",
+            (guild_id, name)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_all(self, table: str, guild_id: int) -> dict:
+        self._check(table)
+        rows = self._conn().execute(
+            f"SELECT name, data FROM {table} WHERE guild_id = ? ORDER BY rowid",
+            (guild_id,)
+        )
+        return {name: json.loads(data) for name, data in rows}
+
+    def names(self, table: str, guild_id: int) -> list:
+        self._check(table)
+        rows = self._conn().execute(
+            f"SELECT name FROM {table} WHERE guild_id = ? ORDER BY rowid",
+            (guild_id,)
+        )
+        return [name for (name,) in rows]
+
+    def guild_ids(self, table: str) -> list:
+        self._check(table)
+        rows = self._conn().execute(f"SELECT DISTINCT guild_id FROM {table}")
+        return [guild_id for (guild_id,) in rows]
+
+    def exists(self, table: str, guild_id: int, name: str) -> bool:
+        self._check(table)
+        row = self._conn().execute(
+            f"SELECT 1 FROM {table} WHERE guild_id = ? AND name = ?",
+            (guild_id, name)
+        ).fetchone()
+        return row is not None
+
+    # ===============================
+    # WRITE
+    # ===============================
+    def upsert(self, table: str, guild_id: int, name: str, data):
+        self._check(table)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                UPSERT.format(table=table),
+                (guild_id, name, _dumps(data), _revision_of(data))
+            )
+
+    def compare_and_set(self, table: str, guild_id: int, name: str, data: dict,
+                        expected_revision=None) -> int:
+        """
+        Save one record if its stored revision still equals
+        ``expected_revision`` (None = unconditional), bumping the revision.
+        BEGIN IMMEDIATE makes the check-and-write atomic across processes.
+        Returns the new revision; raises StaleWriteError on conflict.
+        """
+        self._check(table)
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT revision FROM {table} WHERE guild_id = ? AND name = ?",
+                (guild_id, name)
+            ).fetchone()
+
+            revision = next_revision(
+                name,
+                {REVISION_KEY: row[0]} if row else None,
+                expected_revision
+            )
+            conn.execute(
+                UPSERT.format(table=table),
+                (guild_id, name, _dumps({**data, REVISION_KEY: revision}), revision)
+            )
+        return revision
+
+    def delete(self, table: str, guild_id: int, name: str) -> bool:
+        self._check(table)
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                f"DELETE FROM {table} WHERE guild_id = ? AND name = ?",
+                (guild_id, name)
+            )
+        return cur.rowcount > 0
+
+    def replace_all(self, table: str, guild_id: int, records: dict):
+        """Make ``records`` the complete set of rows for a guild."""
+        self._check(table)
+        conn = self._conn()
+        with conn:
+            existing = {
+                name for (name,) in conn.execute(
+                    f"SELECT name FROM {table} WHERE guild_id = ?", (guild_id,)
+                )
+            }
+            for name in existing - set(records):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE guild_id = ? AND name = ?",
+                    (guild_id, name)
+                )
+            conn.executemany(
+                UPSERT.format(table=table),
+                [(guild_id, name, _dumps(data), _revision_of(data)) for name, data in records.items()]
+            )
+
+    def delete_guild(self, guild_id: int):
+        conn = self._conn()
+        with conn:
+            for table in TABLES:
+                conn.execute(f"DELETE FROM {table} WHERE guild_id = ?", (guild_id,))
+
+    # Stored panel schema version (see PanelStorage.migrate_all)
+    def user_version(self) -> int:
+        return self._conn().execute("PRAGMA user_version").fetchone()[0]
+
+    def set_user_version(self, version: int):
+        conn = self._conn()
+        with conn:
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+# ===============================
+# BACKEND SELECTION
+# ===============================
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_sqlite_storage():
+    """
+    Returns the shared SqliteStorage when STORAGE_BACKEND=sqlite,
+    otherwise None (JSON files are used).
+    """
+    global _instance
+
+    if STORAGE_BACKEND != "sqlite":
+        return None
+
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = SqliteStorage()
+    return _instance
+
+
+# ===============================
+# JSON -> SQLITE IMPORT
+# ===============================
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"⚠️ Skipping {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def import_json_tree(db: SqliteStorage | None = None) -> dict:
+    """
+    Copy the JSON tree (sharded or legacy flat layout, see
+    utils.data_layout) into SQLite:
+
+    - ticket panel files -> panels
+    - embed files        -> embeds
+    - settings files     -> settings (one row per key)
+
+    Safe to re-run: rows are upserted, JSON files are left untouched.
+    Returns the number of imported rows per table.
+    """
+    db = db or SqliteStorage()
+    counts = {table: 0 for table in TABLES}
+
+    for table in TABLES:
+        for guild_id, path in iter_guild_files(table, include_legacy=True):
+            records = _read_json(path)
+            if not records:
+                continue
+
+            conn = db._conn()
+            with conn:
+                conn.executemany(
+                    UPSERT.format(table=table),
+                    [
+                        (guild_id, key, _dumps(value), _revision_of(value))
+                        for key, value in records.items()
+                    ]
+                )
+            counts[table] += len(records)
+
+    # Imported panels may predate the current schema: the next start
+    # has to run the migration pass over them
+    if counts["panels"]:
+        db.set_user_version(0)
+    return counts
+
+
+if __name__ == "__main__":
+    # python -m utils.sqlite_storage
+    result = import_json_tree()
+    print(
+        f"✅ Imported {result['panels']} panel(s), {result['embeds']} embed(s) "
+        f"and {result['settings']} setting(s) into {SQLITE_PATH}"
+    )
@@ -0,0 +1,77 @@
+from tickets.panels.panel_storage import PanelStorage
+from utils.config_snapshot import CONFIG_SNAPSHOT, config_snapshot
+from utils.data_layout import DATA_LAYOUT, LEGACY_DUPLICATES_DIR, count_sharded_files, migrate_to_sharded
+from utils.json_writer import flush_all
+from utils.sqlite_storage import STORAGE_BACKEND
+
+USE_SNAPSHOT = STORAGE_BACKEND == "json" and CONFIG_SNAPSHOT
+
+
+def prepare_storage():
+    """
+    One-time storage maintenance before the bot connects. Run by exactly
+    one process: bot.py when standalone, launcher.py before it starts
+    its workers.
+    """
+    # ───────────── DATA LAYOUT MIGRATION ─────────────
+    # DATA_LAYOUT=sharded moves legacy flat files into
+    # data/{kind}/{xx}/{guild_id}.json; the default flat layout is left as is
+    if STORAGE_BACKEND == "json" and DATA_LAYOUT == "sharded":
+        result = migrate_to_sharded()
+        moved = result["moved"]
+        if any(moved.values()):
+            print(
+                f"📁 DATA_LAYOUT=sharded: moved {moved['panels']} panel, {moved['embeds']} embed and "
+                f"{moved['settings']} settings file(s) from the flat layout to data/{{kind}}/{{xx}}/"
+            )
+        if result["removed"]:
+            print(f"🧹 Removed {result['removed']} flat file(s) identical to their sharded copy")
+        if result["set_aside"]:
+            print(
+                f"⚠️ {len(result['set_aside'])} flat file(s) differed from their sharded copy (which is "
+                f"kept) and were moved to {LEGACY_DUPLICATES_DIR}, e.g. {result['set_aside'][0]}"
+            )
+    elif STORAGE_BACKEND == "json":
+        sharded = count_sharded_files()
+        if sharded:
+            print(f"⚠️ {sharded} file(s) in the sharded layout are ignored; set DATA_LAYOUT=sharded to use them")
+
+    # The snapshot is opened first so a migration pass reads from it
+    # instead of parsing every panel file
+    if USE_SNAPSHOT:
+        config_snapshot.open()
+
+    # ───────────── PANEL SCHEMA MIGRATION ─────────────
+    # Persists old-schema panels once (reads never have to repair/save
+    # them); skipped when the schema marker is already current
+    migrated = PanelStorage().migrate_all()
+    if migrated:
+        print(f"🛠 Migrated panels of {migrated} guild(s) to the current schema")
+
+    # ───────────── CONFIG SNAPSHOT ─────────────
+    # One mmap'd file with every guild's config; only files changed
+    # since the last run are re-parsed, the rest is decoded on demand
+    if USE_SNAPSHOT:
+        stats = config_snapshot.rebuild()
+        print(
+            f"🗂 Config snapshot: {stats['reused']} reused, "
+            f"{stats['encoded']} refreshed, {stats['dropped']} dropped"
+        )
+
+
+def open_storage():
+    """Read-only startup for cluster workers (prepare_storage ran in the launcher)."""
+    if USE_SNAPSHOT:
+        config_snapshot.open()
+
+
+def close_storage(rebuild_snapshot: bool = True):
+    """Write out buffered saves; optionally fold them into the snapshot."""
+    # Write out any panel/embed saves still in the write-behind buffer
+    flush_all()
+
+    if USE_SNAPSHOT:
+        # Fold this session's changes into the snapshot for the next start
+        if rebuild_snapshot:
+            config_snapshot.rebuild()
+        config_snapshot.close()
@@ -4,6 +4,7 @@ from modals.embed_modals import (
     FooterModal, ImagesModal, AddFieldModal, RemoveFieldModal,
     AddButtonModal, RemoveButtonModal
 )
+from utils.revisions import StaleWriteError
 
 
 class EmbedEditorView(discord.ui.View):
@@ -208,11 +209,22 @@ class EmbedEditorView(discord.ui.View):
 
     @discord.ui.button(label="Save", style=discord.ButtonStyle.secondary, row=2)
     async def save_button(self, interaction: discord.Interaction, _):
-        success = self.storage.save_embed(
-            self.guild_id,
-            self.embed_name,
-            self.embed_state
-        )
+        # Loaded embeds carry a revision: refuse to overwrite a newer save.
+        # New embeds (no revision yet) overwrite, as before.
+        try:
+            success = await self.storage.asave_embed(
+                self.guild_id,
+                self.embed_name,
+                self.embed_state,
+                expected_revision=self.embed_state.get("revision")
+            )
+        except StaleWriteError:
+            await interaction.response.send_message(
+                "❌ This embed was changed by someone else while you were editing.\n"
+                "💡 Use `/embed load` to get the latest version.",
+                ephemeral=True
+            )
+            return
         await interaction.response.send_message(
             "✅ Embed saved!" if success else "❌ Failed to save embed.",
             ephemeral=True